@@ -0,0 +1,134 @@
+import os
+import glob
+import time
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+import etl_argo
+
+# --- CONFIGURATION ---
+# Sample files shipped with the repo; the benchmark upserts them into the DB configured in etl_argo.DB_CONN
+SAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nc_files")
+REPEATS = 3
+TRANSFORM_SAMPLE = os.path.join(SAMPLE_FOLDER, "prof_files", "7902246_prof.nc")
+TRANSFORM_REPEATS = 20
+
+PROCESSORS = {
+    "meta_files": etl_argo.process_meta_file,
+    "prof_files": etl_argo.process_prof_file,
+    "tech_files": etl_argo.process_tech_file,
+    "sprof_files": etl_argo.process_sprof_file,
+}
+
+LOADER_VARIANTS = [
+    ("values", None),
+    ("copy", "csv"),
+    ("copy", "binary"),
+]
+
+def legacy_process_nc_file(ds):
+    """The per-profile loop process_nc_file used before it was vectorized, kept as the benchmark reference."""
+    primary_dims = ('N_PROF', 'N_CYCLE', 'N_MEASUREMENT')
+    primary_dim = next((dim for dim in primary_dims if dim in ds.sizes), None)
+    num_profiles = ds.sizes.get(primary_dim, 1) if primary_dim else 1
+    level_dim_name = 'N_LEVELS' if 'N_LEVELS' in ds.dims else None
+    metadata_rows = [{} for _ in range(num_profiles)]
+    measurement_vars_by_profile = [{} for _ in range(num_profiles)]
+    for var_name, variable in ds.variables.items():
+        var_name_lower = var_name.lower()
+        if level_dim_name and level_dim_name in variable.dims:
+            if primary_dim and num_profiles > 1 and variable.ndim == 2:
+                for i in range(num_profiles):
+                    measurement_vars_by_profile[i][var_name_lower] = variable.values[i]
+            else:
+                measurement_vars_by_profile[0][var_name_lower] = variable.values.flatten()
+        elif primary_dim and primary_dim in variable.dims and variable.ndim == 1:
+            for i in range(num_profiles):
+                metadata_rows[i][var_name_lower] = etl_argo.clean_and_decode_value(variable.values[i])
+        elif variable.ndim <= 1:
+            value = etl_argo.clean_and_decode_value(variable.values.item(0) if variable.values.size > 0 else None)
+            for i in range(num_profiles):
+                metadata_rows[i][var_name_lower] = value
+    metadata_df = pd.DataFrame(metadata_rows)
+    all_measurements_dfs = []
+    if level_dim_name and any(measurement_vars_by_profile):
+        for i in range(num_profiles):
+            if measurement_vars_by_profile[i]:
+                measurements_df = pd.DataFrame(measurement_vars_by_profile[i])
+                if 'platform_number' in metadata_df.columns: measurements_df['platform_number'] = metadata_df.at[i, 'platform_number']
+                if 'cycle_number' in metadata_df.columns: measurements_df['cycle_number'] = metadata_df.at[i, 'cycle_number']
+                measurements_df['n_levels'] = np.arange(len(measurements_df))
+                all_measurements_dfs.append(measurements_df)
+    measurements_df = pd.concat(all_measurements_dfs, ignore_index=True) if all_measurements_dfs else pd.DataFrame()
+    return metadata_df, measurements_df
+
+def benchmark_transform(path=TRANSFORM_SAMPLE):
+    """Compares the vectorized process_nc_file with the legacy per-profile loop on one profile file."""
+    print(f"\n--- Transform benchmark on {os.path.basename(path)} (best of {TRANSFORM_REPEATS}) ---")
+    with xr.open_dataset(path, decode_times=False) as ds:
+        ds = ds.load()
+    legacy_meta, legacy_measurements = legacy_process_nc_file(ds)
+    metadata_df, measurements_df = etl_argo.process_nc_file(ds)
+    # The derived calibration/sampling and profile_time columns are added on top of the reshaping, so compare the shared columns
+    pd.testing.assert_frame_equal(legacy_meta[[c for c in legacy_meta.columns if c in metadata_df.columns]],
+                                  metadata_df[[c for c in legacy_meta.columns if c in metadata_df.columns]])
+    pd.testing.assert_frame_equal(legacy_measurements, measurements_df[legacy_measurements.columns])
+    legacy_time = time_it(lambda: legacy_process_nc_file(ds), TRANSFORM_REPEATS)
+    vectorized_time = time_it(lambda: etl_argo.process_nc_file(ds), TRANSFORM_REPEATS)
+    print(f"   -> {'legacy per-profile loop':<25}: {legacy_time * 1000:.1f}ms")
+    print(f"   -> {'vectorized':<25}: {vectorized_time * 1000:.1f}ms  ({legacy_time / vectorized_time:.1f}x faster, output identical)")
+
+def load_samples():
+    """Opens every sample file once and loads it into memory so only the ETL work is timed."""
+    samples = []
+    for folder_name, processor in PROCESSORS.items():
+        for path in sorted(glob.glob(os.path.join(SAMPLE_FOLDER, folder_name, "*.nc"))):
+            with xr.open_dataset(path, decode_times=False) as ds:
+                samples.append((os.path.basename(path), ds.load(), processor))
+    return samples
+
+def ingest(samples):
+    """Runs every sample through its processor, one transaction per file like the ETL workers."""
+    for _, ds, processor in samples:
+        with etl_argo.get_engine().begin() as conn:
+            processor(ds, conn)
+
+def time_it(func, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def benchmark_loaders(samples):
+    """Times the full transform + upsert of every sample file with each loader variant (best of REPEATS)."""
+    print("\n--- Loader benchmark (transform + upsert, best of %d) ---" % REPEATS)
+    original = (etl_argo.LOADER, etl_argo.COPY_FORMAT)
+    # Warm-up run so table creation and schema changes are not part of the timings
+    ingest(samples)
+    try:
+        decode_time = time_it(lambda: [etl_argo.process_nc_file(ds) for _, ds, _ in samples])
+        print(f"   -> {'transform only':<25}: {decode_time:.3f}s")
+        for loader, copy_format in LOADER_VARIANTS:
+            etl_argo.LOADER = loader
+            etl_argo.COPY_FORMAT = copy_format or etl_argo.COPY_FORMAT
+            elapsed = time_it(lambda: ingest(samples))
+            label = loader if not copy_format else f"{loader} ({copy_format})"
+            print(f"   -> {label:<25}: {elapsed:.3f}s  (load ~{max(elapsed - decode_time, 0):.3f}s)")
+    finally:
+        etl_argo.LOADER, etl_argo.COPY_FORMAT = original
+
+if __name__ == "__main__":
+    if os.path.exists(TRANSFORM_SAMPLE):
+        benchmark_transform()
+    print(f"\n🚀 Loading sample files from {SAMPLE_FOLDER}...")
+    samples = load_samples()
+    if not samples:
+        print("❌ No sample .nc files found. Exiting.")
+    else:
+        print(f"   -> {len(samples)} files loaded.")
+        benchmark_loaders(samples)
+        print("\n✅ Benchmark finished.")
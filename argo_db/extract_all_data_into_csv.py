@@ -1,6 +1,10 @@
 import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import xarray as xr
+from multiprocessing import Pool, cpu_count
 from tqdm import tqdm
 import logging
 
@@ -13,49 +17,70 @@ SOURCE_FOLDERS = {
 OUTPUT_FILE = r"E:\argo_db\scientific_measurements.csv"
 LOG_FILE = r"E:\argo_db\measurement_extraction.log"
 
-# --- LOGGING ---
-logging.basicConfig(filename=LOG_FILE, filemode='w', format='%(asctime)s | %(levelname)s | %(message)s', level=logging.INFO)
+# "csv" or "parquet"; each file's rows are appended to the output as soon as a worker has extracted them
+OUTPUT_FORMAT = "csv"
+PARQUET_COMPRESSION = "zstd"
+WORKERS = cpu_count()
+# Files handed to the pool at a time; at most this many extracted files wait for the writer
+BATCH_FILES = WORKERS * 4
+
+# Only these variables are read from each file, flattened to one row per profile and level.
+# Per-profile variables (N_PROF) are repeated alongside the per-level ones (N_PROF x N_LEVELS).
+PROFILE_VARIABLES = ['PLATFORM_NUMBER', 'CYCLE_NUMBER', 'DIRECTION', 'JULD', 'LATITUDE', 'LONGITUDE']
+LEVEL_VARIABLES = ['PRES', 'TEMP', 'PSAL',
+                   # For Sprof files, adjusted values might be present
+                   'PRES_ADJUSTED', 'TEMP_ADJUSTED', 'PSAL_ADJUSTED']
+
+# Every output chunk has these columns and types, whichever variables the file had
+OUTPUT_SCHEMA = pa.schema([
+    ('platform_number', pa.string()), ('cycle_number', pa.float64()), ('direction', pa.string()),
+    ('juld', pa.timestamp('ns')), ('latitude', pa.float64()), ('longitude', pa.float64()),
+    ('pres', pa.float32()), ('temp', pa.float32()), ('psal', pa.float32()),
+    ('pres_adjusted', pa.float32()), ('temp_adjusted', pa.float32()), ('psal_adjusted', pa.float32()),
+])
+# pandas dtype per output column, so columns a file lacks (all NaN) still convert to OUTPUT_SCHEMA
+OUTPUT_DTYPES = {field.name: field.type.to_pandas_dtype() for field in OUTPUT_SCHEMA}
+# JULD is days since this date; used when xarray leaves it undecoded (missing or unparsable units)
+ARGO_EPOCH = pd.Timestamp('1950-01-01')
+JULD_FILL = 999999.0
+
+def decode_text(values):
+    """Fixed-width byte strings (b'7902246 ') as stripped str."""
+    if values.dtype == object or values.dtype.kind == 'S':
+        values = np.array([v.decode('utf-8', 'ignore') if isinstance(v, (bytes, np.bytes_)) else v for v in values], dtype=object)
+        return np.array([v.strip().strip('\x00') if isinstance(v, str) else v for v in values], dtype=object)
+    return values
 
 def extract_measurements_from_file(file_path):
-    """Opens a single NetCDF file and extracts a DataFrame of measurements."""
+    """Opens a single NetCDF file and extracts a DataFrame of measurements (one row per profile and level).
+    Returns (file_path, DataFrame or None, error message or None); runs in a worker process."""
     try:
         with xr.open_dataset(file_path) as ds:
-            # Convert the entire dataset to a pandas DataFrame
-            # xarray cleverly expands the metadata to match the measurements
-            df = ds.to_dataframe()
-            
-            # Reset index to turn levels like N_PROF and N_LEVELS into columns
-            df = df.reset_index()
-            
-            # Define the core columns we want to keep
-            # Use .lower() to match the case we used in the ETL script
-            df.columns = [col.lower() for col in df.columns]
-            
-            core_columns = [
-                'platform_number', 'cycle_number', 'direction', 'juld',
-                'latitude', 'longitude', 'pres', 'temp', 'psal'
-            ]
-            
-            # For Sprof files, adjusted values might be present
-            sprof_columns = ['pres_adjusted', 'temp_adjusted', 'psal_adjusted']
-            
-            final_columns = []
-            for col in core_columns + sprof_columns:
-                if col in df.columns:
-                    final_columns.append(col)
-            
-            if not final_columns:
-                return None
-                
-            return df[final_columns]
-            
+            levels = [v for v in LEVEL_VARIABLES if v in ds.variables and ds[v].dims == ('N_PROF', 'N_LEVELS')]
+            if not levels:
+                return file_path, None, None
+            n_prof, n_levels = ds.sizes['N_PROF'], ds.sizes['N_LEVELS']
+
+            # Only the selected variables are read from disk; nothing is broadcast over N_PARAM, N_CALIB, ...
+            columns = {}
+            for var in PROFILE_VARIABLES:
+                if var in ds.variables and ds[var].dims == ('N_PROF',):
+                    columns[var.lower()] = np.repeat(decode_text(ds[var].values), n_levels)
+            for var in levels:
+                columns[var.lower()] = ds[var].values.reshape(n_prof * n_levels)
+
+        if 'juld' in columns and columns['juld'].dtype.kind != 'M':
+            days = pd.to_numeric(columns['juld'], errors='coerce')
+            columns['juld'] = ARGO_EPOCH + pd.to_timedelta(np.where(days < JULD_FILL, days, np.nan), unit='D')
+        df = pd.DataFrame(columns).reindex(columns=OUTPUT_SCHEMA.names).astype(OUTPUT_DTYPES)
+        # Drop rows where the core measurements are all missing (the padding after each profile's last level)
+        df.dropna(subset=['pres', 'temp', 'psal'], how='all', inplace=True)
+        return file_path, df, None
+
     except Exception as e:
-        logging.error(f"Failed to process file {file_path}: {e}")
-        return None
+        return file_path, None, str(e)
 
-if __name__ == "__main__":
-    print("🚀 Starting extraction of detailed scientific measurements...")
-    
+def list_source_files():
     all_files_to_process = []
     for folder_type, folder_path in SOURCE_FOLDERS.items():
         try:
@@ -64,33 +89,77 @@ if __name__ == "__main__":
             print(f"   -> Found {len(files)} files in '{folder_type}' folder.")
         except FileNotFoundError:
             print(f"   -> WARNING: Folder not found, skipping: {folder_path}")
+    return all_files_to_process
+
+class MeasurementWriter:
+    """Appends DataFrames to the CSV or Parquet output. Rows go to <output>.tmp, which replaces the
+    output on close(), so an interrupted run leaves the previous file in place."""
+
+    def __init__(self, path, output_format=OUTPUT_FORMAT):
+        self.path, self.format = path, output_format
+        self.tmp_path = path + ".tmp"
+        self.rows = 0
+        self.parquet = pq.ParquetWriter(self.tmp_path, OUTPUT_SCHEMA, compression=PARQUET_COMPRESSION) if output_format == "parquet" else None
+        if self.parquet is None:
+            pd.DataFrame(columns=OUTPUT_SCHEMA.names).to_csv(self.tmp_path, index=False)
+
+    def write(self, df):
+        if self.parquet is not None:
+            self.parquet.write_table(pa.Table.from_pandas(df, schema=OUTPUT_SCHEMA, preserve_index=False))
+        else:
+            df.to_csv(self.tmp_path, mode='a', header=False, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+        os.replace(self.tmp_path, self.path)
+
+def extract_all(files, output_file=OUTPUT_FILE, output_format=OUTPUT_FORMAT):
+    """Extracts the files in a process pool and streams their rows into output_file.
+    Returns (rows written, files with data, first rows for the preview)."""
+    writer = MeasurementWriter(output_file, output_format)
+    files_with_data, preview = 0, None
+    try:
+        with Pool(processes=WORKERS) as pool, tqdm(total=len(files)) as progress:
+            for i in range(0, len(files), BATCH_FILES):
+                for file_path, df, error in pool.imap_unordered(extract_measurements_from_file, files[i:i + BATCH_FILES]):
+                    progress.update()
+                    if error:
+                        logging.error(f"Failed to process file {file_path}: {error}")
+                    elif df is not None and len(df):
+                        try:
+                            writer.write(df)
+                        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+                            # Nothing of the file was written; skip it like a file that failed to read
+                            logging.error(f"Failed to convert file {file_path}: {e}")
+                            continue
+                        files_with_data += 1
+                        if preview is None:
+                            preview = df.head()
+    except BaseException:
+        if writer.parquet is not None:
+            writer.parquet.close()
+        os.remove(writer.tmp_path)
+        raise
+    writer.close()
+    return writer.rows, files_with_data, preview
+
+if __name__ == "__main__":
+    logging.basicConfig(filename=LOG_FILE, filemode='w', format='%(asctime)s | %(levelname)s | %(message)s', level=logging.INFO)
+    print("🚀 Starting extraction of detailed scientific measurements...")
+
+    all_files_to_process = list_source_files()
 
     if not all_files_to_process:
         print("❌ No source files found in the configured folders. Exiting.")
     else:
-        all_dfs = []
-        print(f"\n⚙️  Processing {len(all_files_to_process)} files...")
-        
-        for f in tqdm(all_files_to_process):
-            df = extract_measurements_from_file(f)
-            if df is not None:
-                all_dfs.append(df)
-        
-        if not all_dfs:
+        print(f"\n⚙️  Processing {len(all_files_to_process)} files with {WORKERS} workers, writing to '{OUTPUT_FILE}'...")
+        rows, files_with_data, preview = extract_all(all_files_to_process)
+
+        if not rows:
             print("❌ Could not extract any valid data from the source files.")
         else:
-            print("\n consolidating all data into a single table...")
-            # Concatenate all individual DataFrames into one large DataFrame
-            final_df = pd.concat(all_dfs, ignore_index=True)
-            
-            # Drop rows where the core measurements are all missing
-            final_df.dropna(subset=['pres', 'temp', 'psal'], how='all', inplace=True)
-            
-            print(f"✅ Success! Assembled a dataset with {len(final_df)} total measurements.")
-            
-            print(f"💾 Saving data to '{OUTPUT_FILE}'...")
-            final_df.to_csv(OUTPUT_FILE, index=False)
-            
-            print(f"\n🎉 Successfully saved the full measurement dataset.")
+            print(f"✅ Success! Saved a dataset with {rows} total measurements from {files_with_data} files.")
             print("\nPreview of the first 5 rows:")
-            print(final_df.head())
\ No newline at end of file
+            print(preview)
@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+from netCDF4 import Dataset
+from tqdm import tqdm
+
+# --- CONFIGURATION ---
+# Every .nc file under these folders is indexed; headers only (dimensions, variables, dtypes, attributes), no data
+CATALOG_ROOTS = [r"E:\argo_db\nc_files", r"E:\argo_db\processed"]
+CATALOG_FILE = r"E:\argo_db\nc_catalog.sqlite"
+WORKERS = cpu_count()
+# Files re-read only when their size or modification time changed; catalog rows of files gone from the roots are removed
+PRUNE_MISSING = True
+
+CATALOG_DDL = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, file_name TEXT, file_type TEXT, file_size INTEGER, file_mtime REAL,
+    data_model TEXT, global_attrs TEXT, indexed_at REAL, error TEXT
+);
+CREATE TABLE IF NOT EXISTS dimensions (
+    path TEXT, name TEXT, size INTEGER, is_unlimited INTEGER, PRIMARY KEY (path, name)
+);
+CREATE TABLE IF NOT EXISTS variables (
+    path TEXT, name TEXT, dimensions TEXT, shape TEXT, dtype TEXT, attrs TEXT, PRIMARY KEY (path, name)
+);
+CREATE INDEX IF NOT EXISTS variables_name ON variables (name);
+CREATE INDEX IF NOT EXISTS files_type_size ON files (file_type, file_size);
+"""
+
+def attr_value(value):
+    """An attribute as something json can store (numpy scalars / arrays, bytes)."""
+    if isinstance(value, np.ndarray):
+        return [attr_value(v) for v in value.tolist()]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bytes):
+        return value.decode('utf-8', 'ignore')
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+def attributes(obj):
+    return {name: attr_value(obj.getncattr(name)) for name in obj.ncattrs()}
+
+def file_type(path):
+    """'prof', 'sprof', 'meta', 'tech', 'rtraj', ... from the Argo file name (7902246_Sprof.nc)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem.rsplit('_', 1)[-1].lower() if '_' in stem else None
+
+def read_header(path):
+    """Catalog record of one file, None when the file is gone. Opening a NetCDF file only reads its header;
+    no variable data is touched."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    record = {"path": path, "file_name": os.path.basename(path), "file_type": file_type(path),
+              "file_size": stat.st_size, "file_mtime": stat.st_mtime, "data_model": None, "global_attrs": None,
+              "indexed_at": time.time(), "error": None, "dimensions": [], "variables": []}
+    try:
+        with Dataset(path, mode='r') as nc_file:
+            record["data_model"] = nc_file.data_model
+            record["global_attrs"] = json.dumps(attributes(nc_file), default=str)
+            record["dimensions"] = [(name, len(dim), int(dim.isunlimited())) for name, dim in nc_file.dimensions.items()]
+            record["variables"] = [
+                (name, json.dumps(var.dimensions), json.dumps(var.shape), str(var.dtype), json.dumps(attributes(var), default=str))
+                for name, var in nc_file.variables.items()
+            ]
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+def connect(catalog_file=CATALOG_FILE):
+    conn = sqlite3.connect(catalog_file)
+    conn.executescript(CATALOG_DDL)
+    return conn
+
+def find_nc_files(roots):
+    paths = []
+    for root in roots:
+        for folder, _, names in os.walk(root):
+            paths.extend(os.path.abspath(os.path.join(folder, name)) for name in names if name.endswith(".nc"))
+    return paths
+
+def store_records(conn, records):
+    """Replaces the catalog rows of the given files, in the caller's transaction."""
+    paths = [(r["path"],) for r in records]
+    for table in ("dimensions", "variables"):
+        conn.executemany(f"DELETE FROM {table} WHERE path = ?", paths)
+    conn.executemany(
+        "INSERT OR REPLACE INTO files VALUES (:path, :file_name, :file_type, :file_size, :file_mtime, "
+        ":data_model, :global_attrs, :indexed_at, :error)", records)
+    conn.executemany("INSERT INTO dimensions VALUES (?, ?, ?, ?)", [(r["path"],) + d for r in records for d in r["dimensions"]])
+    conn.executemany("INSERT INTO variables VALUES (?, ?, ?, ?, ?, ?)", [(r["path"],) + v for r in records for v in r["variables"]])
+
+def update_catalog(paths, catalog_file=CATALOG_FILE, prune_under=None, workers=WORKERS, progress=True):
+    """Indexes the files that are new or changed (size / mtime) since they were last catalogued, reading the
+    headers in a process pool. Catalog rows of files under the prune_under folders that no longer exist are removed.
+    Returns (files indexed, files removed)."""
+    paths = [os.path.abspath(p) for p in paths]
+    with connect(catalog_file) as conn:
+        known = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT path, file_size, file_mtime FROM files")}
+        stale = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                logging.warning(f"File disappeared before it could be catalogued, skipping: {path}")
+                continue
+            if known.get(path) != (stat.st_size, stat.st_mtime):
+                stale.append(path)
+
+        indexed = 0
+        if stale:
+            with Pool(processes=max(1, min(workers, len(stale)))) as pool:
+                records = pool.imap_unordered(read_header, stale, chunksize=16)
+                batch = []
+                for record in tqdm(records, total=len(stale), disable=not progress):
+                    if record is None: continue  # removed since the stale check
+                    batch.append(record)
+                    if record["error"]:
+                        logging.error(f"Could not read header of {record['path']}: {record['error']}")
+                    if len(batch) >= 500:
+                        store_records(conn, batch)
+                        indexed += len(batch)
+                        batch = []
+                store_records(conn, batch)
+                indexed += len(batch)
+
+        removed = []
+        if prune_under:
+            present = set(paths)
+            roots = [os.path.join(os.path.abspath(root), '') for root in prune_under]
+            removed = [(path,) for path in known if path.startswith(tuple(roots)) and path not in present]
+            for table in ("files", "dimensions", "variables"):
+                conn.executemany(f"DELETE FROM {table} WHERE path = ?", removed)
+    conn.close()
+    return indexed, len(removed)
+
+def files_with_variable(variable, catalog_file=CATALOG_FILE):
+    """Paths of the catalogued files that have the variable (e.g. 'DOXY'), largest first."""
+    with connect(catalog_file) as conn:
+        rows = conn.execute(
+            "SELECT f.path FROM variables v JOIN files f ON f.path = v.path WHERE v.name = ? ORDER BY f.file_size DESC",
+            (variable,)).fetchall()
+    conn.close()
+    return [row[0] for row in rows]
+
+def _select_paths(conn, paths):
+    """Fills the temp table 'wanted' with paths, for joins against the catalog."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (path TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM wanted")
+    conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", [(os.path.abspath(p),) for p in paths])
+
+def catalog_entries(paths, catalog_file=CATALOG_FILE):
+    """path -> (file size, set of variable names) for the catalogued files among paths."""
+    entries = {}
+    with connect(catalog_file) as conn:
+        _select_paths(conn, paths)
+        for path, size in conn.execute("SELECT f.path, f.file_size FROM files f JOIN wanted USING (path)"):
+            entries[path] = (size, set())
+        for path, name in conn.execute("SELECT v.path, v.name FROM variables v JOIN wanted USING (path)"):
+            entries[path][1].add(name)
+    conn.close()
+    return entries
+
+def new_variables(paths, catalog_file=CATALOG_FILE):
+    """Variables of the given files that no other catalogued file has: name -> number of the given files with it."""
+    with connect(catalog_file) as conn:
+        _select_paths(conn, paths)
+        rows = conn.execute(
+            "SELECT v.name, count(*) FROM variables v JOIN wanted USING (path) WHERE NOT EXISTS ("
+            "SELECT 1 FROM variables o WHERE o.name = v.name AND o.path NOT IN (SELECT path FROM wanted)) "
+            "GROUP BY v.name ORDER BY v.name").fetchall()
+    conn.close()
+    return dict(rows)
+
+def print_header(file_path):
+    """The old Test.py view of one file: global attributes, dimensions and variables with their attributes."""
+    record = read_header(file_path)
+    if record is None:
+        print("❌ File does not exist!")
+        return
+    if record["error"]:
+        print(f"❌ Could not read the file: {record['error']}")
+        return
+
+    print("\n--- Global Attributes ---")
+    for attr, value in json.loads(record["global_attrs"]).items():
+        print(f"{attr}: {value}")
+
+    print("\n--- Dimensions ---")
+    for dim_name, size, unlimited in record["dimensions"]:
+        print(f"{dim_name}: size = {size}, is_unlimited = {bool(unlimited)}")
+
+    print("\n--- Variables ---")
+    for var_name, dims, shape, dtype, attrs in record["variables"]:
+        print(f"\nVariable: {var_name}")
+        print(f"  Dimensions: {tuple(json.loads(dims))}")
+        print(f"  Shape: {tuple(json.loads(shape))}")
+        print(f"  Data type: {dtype}")
+        for attr_name, value in json.loads(attrs).items():
+            print(f"  {attr_name}: {value}")
+
+if __name__ == "__main__":
+    # python nc_catalog.py               -> index CATALOG_ROOTS
+    # python nc_catalog.py DOXY          -> catalogued files with that variable
+    # python nc_catalog.py some_file.nc  -> print one file's header
+    arg = sys.argv[1] if len(sys.argv) > 1 else None
+    if arg and arg.endswith(".nc"):
+        print_header(arg)
+    elif arg:
+        matches = files_with_variable(arg)
+        print(f"🔍 {len(matches)} catalogued files contain '{arg}':")
+        for path in matches:
+            print(f"   {path}")
+    else:
+        print(f"🚀 Indexing NetCDF headers under {', '.join(CATALOG_ROOTS)}...")
+        all_paths = find_nc_files(CATALOG_ROOTS)
+        indexed, removed = update_catalog(all_paths, prune_under=CATALOG_ROOTS if PRUNE_MISSING else None)
+        print(f"✅ {len(all_paths)} files in the catalog: {indexed} (re)indexed, {len(all_paths) - indexed} unchanged, {removed} removed.")
+        with connect() as conn:
+            for file_kind, count, size in conn.execute(
+                    "SELECT file_type, count(*), sum(file_size) FROM files GROUP BY file_type ORDER BY 3 DESC"):
+                print(f"   -> {file_kind or '?'}: {count} files, {size / 1e6:.1f} MB")
+        conn.close()
+        print(f"💾 Catalog: {CATALOG_FILE}")
@@ -0,0 +1,84 @@
+"""Reader for the Parquet dataset written by extract_training_data.py.
+
+Layout: <dataset>/platform_number=<id>/year=<YYYY>/part-0.parquet, rows in month order, zstd-compressed with min/max
+statistics per row group. Platform and time filters prune partitions (the files of other platforms and
+years are never opened); time and region filters are then checked against the row-group statistics of profile_time,
+latitude and longitude, so reading one month of one region only decodes the row groups that can match.
+
+    from parquet_dataset import read, scan
+    table = read(start=datetime(2023, 3, 1), end=datetime(2023, 4, 1), bbox=(-10, 10, 60, 90))
+    lazy = scan(platforms=["7902246"]).select("cycle_number", "pres", "temp")   # polars LazyFrame
+"""
+from datetime import timedelta, timezone
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# --- CONFIGURATION ---
+DATASET_PATH = r"E:\argo_db\output\parquet\model_training_data_final"
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("platform_number", pa.string()), ("year", pa.int16())]), flavor="hive"
+)
+
+
+def open_dataset(path=DATASET_PATH):
+    """The dataset with its partition keys as columns; '_'-prefixed files (refresh state, staging) are skipped."""
+    return ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+
+
+def _utc(value):
+    # Naive datetimes are taken as UTC, like profile_time
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def build_filter(start=None, end=None, bbox=None, platforms=None):
+    """Filter expression for rows with start <= profile_time < end, inside bbox and of the given platforms.
+
+    bbox is (lat_min, lat_max, lon_min, lon_max); lon_min > lon_max crosses the antimeridian. The time bounds
+    are stated on the year partition key as well, which is what lets whole files be pruned.
+    Returns None when there is nothing to filter.
+    """
+    conditions = []
+    if start is not None:
+        start = _utc(start)
+        conditions += [ds.field("year") >= start.year, ds.field("profile_time") >= pa.scalar(start, pa.timestamp("ns", "UTC"))]
+    if end is not None:
+        end = _utc(end)
+        conditions += [ds.field("year") <= (end - timedelta(microseconds=1)).year, ds.field("profile_time") < pa.scalar(end, pa.timestamp("ns", "UTC"))]
+    if bbox is not None:
+        lat_min, lat_max, lon_min, lon_max = bbox
+        conditions += [ds.field("latitude") >= lat_min, ds.field("latitude") <= lat_max]
+        if lon_min <= lon_max:
+            conditions += [ds.field("longitude") >= lon_min, ds.field("longitude") <= lon_max]
+        else:
+            conditions.append((ds.field("longitude") >= lon_min) | (ds.field("longitude") <= lon_max))
+    if platforms is not None:
+        conditions.append(ds.field("platform_number").isin([str(p) for p in platforms]))
+    if not conditions:
+        return None
+    expression = conditions[0]
+    for condition in conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def read(path=DATASET_PATH, columns=None, start=None, end=None, bbox=None, platforms=None):
+    """Matching rows as a pyarrow Table (columns=None reads them all)."""
+    return open_dataset(path).to_table(columns=columns, filter=build_filter(start, end, bbox, platforms))
+
+
+def scan(path=DATASET_PATH, start=None, end=None, bbox=None, platforms=None):
+    """Matching rows as a polars LazyFrame. Nothing is read until collect(); the filters above and any column
+    selection or further simple filters in polars are pushed down to the pyarrow scan."""
+    dataset = open_dataset(path)
+    expression = build_filter(start, end, bbox, platforms)
+    if expression is not None:
+        dataset = dataset.filter(expression)
+    return pl.scan_pyarrow_dataset(dataset)
+
+
+def count_rows(path=DATASET_PATH, start=None, end=None, bbox=None, platforms=None):
+    """Number of matching rows; answered from file metadata where the filter allows it."""
+    return open_dataset(path).count_rows(filter=build_filter(start, end, bbox, platforms))
@@ -2,4 +2,20 @@
 CREATE INDEX idx_profiles_platform_cycle ON profiles (platform_number, cycle_number);
 
 -- Creates an index on the filename for quick checks in the processedfiles table
-CREATE INDEX idx_processedfiles_filename ON processedfiles (filename);
\ No newline at end of file
+CREATE INDEX idx_processedfiles_filename ON processedfiles (filename);
+
+-- BRIN index on the decoded profile time for date-window queries on profiles
+-- (measurements gets one per monthly partition from etl_argo.py)
+CREATE INDEX IF NOT EXISTS idx_profiles_profile_time_brin ON profiles USING brin (profile_time);
+
+-- Spatial grid cell of each profile position (etl_argo.GEO_CELL_DEG = 1 degree cells), used by the
+-- nearest-float / radius searches instead of scanning latitude/longitude. The ETL fills geo_cell and creates
+-- the index itself; the UPDATE backfills rows loaded before the column existed (-1 = no valid position).
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS geo_cell BIGINT;
+UPDATE profiles SET geo_cell = CASE
+    WHEN latitude BETWEEN -90 AND 90 AND longitude BETWEEN -1e6 AND 1e6
+    THEN LEAST(floor((latitude + 90) / 1.0), 179)::bigint * 360
+         + floor((longitude + 180 - 360 * floor((longitude + 180) / 360)) / 1.0)::bigint % 360
+    ELSE -1 END
+WHERE geo_cell IS NULL;
+CREATE INDEX IF NOT EXISTS idx_profiles_geo_cell ON profiles (geo_cell);
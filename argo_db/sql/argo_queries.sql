@@ -80,3 +80,23 @@ SELECT row_number() OVER (ORDER BY processed_at DESC) AS row_num,
 FROM processedfiles f, settings s
 ORDER BY processed_at DESC
 LIMIT COALESCE(s.limit_rows, ALL);
+
+-- Ingest throughput per day (from the processedfiles manifest)
+SELECT '--- Ingest Throughput ---' AS section, NULL AS info;
+SELECT date_trunc('day', processed_at) AS day,
+       COUNT(*) AS files,
+       SUM(rows_written) AS rows_written,
+       ROUND((SUM(rows_written) / NULLIF(SUM(ingest_seconds), 0))::numeric, 1) AS rows_per_second
+FROM processedfiles
+WHERE rows_written IS NOT NULL
+GROUP BY 1
+ORDER BY 1 DESC;
+
+-- Float tracks (one row per float from the trajectory files; no scan of the rtraj points)
+SELECT '--- Float Tracks ---' AS section, NULL AS info;
+SELECT row_number() OVER (ORDER BY last_time DESC NULLS LAST) AS row_num,
+       platform_number, cycle_count, first_time, last_time,
+       last_latitude, last_longitude, min_latitude, max_latitude, min_longitude, max_longitude
+FROM float_tracks, settings s
+ORDER BY last_time DESC NULLS LAST
+LIMIT COALESCE(s.limit_rows, ALL);
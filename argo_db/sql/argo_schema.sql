@@ -47,5 +47,10 @@ CREATE TABLE tech (
 ----------------------------------------------------------------------
 CREATE TABLE processedfiles (
     filename TEXT PRIMARY KEY,
-    processed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    processed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+    file_size BIGINT,               -- manifest fingerprint: size + mtime for the scan-time skip check
+    file_mtime DOUBLE PRECISION,
+    content_hash TEXT,              -- blake2b of the file, re-releases with new content are re-ingested
+    rows_written BIGINT,
+    ingest_seconds DOUBLE PRECISION
 );
@@ -0,0 +1,49 @@
+----------------------------------------------------------------------
+-- One-off migration: turns an existing, unpartitioned 'measurements' table into the layout
+-- etl_argo.py now creates, range-partitioned by month on profile_time.
+-- New databases do not need this; the ETL creates the partitioned table on its first load.
+-- Run it with the ETL stopped. Everything happens in one transaction.
+----------------------------------------------------------------------
+BEGIN;
+
+-- profile_time for the existing profiles, decoded from JULD (days since 1950-01-01 UTC)
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS profile_time TIMESTAMPTZ;
+UPDATE profiles SET profile_time = date_trunc('microseconds', TIMESTAMPTZ '1950-01-01 00:00:00+00' + juld * INTERVAL '1 day')
+WHERE profile_time IS NULL AND juld IS NOT NULL AND juld <> 'NaN';
+
+ALTER TABLE measurements RENAME TO measurements_unpartitioned;
+ALTER INDEX IF EXISTS measurements_pkey RENAME TO measurements_unpartitioned_pkey;
+ALTER TABLE measurements_unpartitioned ADD COLUMN IF NOT EXISTS profile_time TIMESTAMPTZ;
+UPDATE measurements_unpartitioned m SET profile_time = p.profile_time
+FROM profiles p
+WHERE p.platform_number = m.platform_number AND p.cycle_number = m.cycle_number AND m.profile_time IS NULL;
+-- Same sentinel as etl_argo.UNKNOWN_PROFILE_TIME: rows without a profile time go to the 1950-01 partition
+UPDATE measurements_unpartitioned SET profile_time = TIMESTAMPTZ '1950-01-01 00:00:00+00' WHERE profile_time IS NULL;
+
+CREATE TABLE measurements (LIKE measurements_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (profile_time);
+
+-- One partition per month present in the data, named like the ones the ETL creates (measurements_y2023m03)
+DO $$
+DECLARE
+    month_start TIMESTAMP;
+BEGIN
+    FOR month_start IN
+        SELECT DISTINCT date_trunc('month', profile_time AT TIME ZONE 'UTC') FROM measurements_unpartitioned
+    LOOP
+        EXECUTE format('CREATE TABLE %I PARTITION OF measurements FOR VALUES FROM (%L) TO (%L)',
+                       'measurements_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+                       to_char(month_start, 'YYYY-MM-DD') || ' 00:00:00+00',
+                       to_char(month_start + INTERVAL '1 month', 'YYYY-MM-DD') || ' 00:00:00+00');
+    END LOOP;
+END $$;
+
+INSERT INTO measurements SELECT * FROM measurements_unpartitioned;
+
+ALTER TABLE measurements ADD PRIMARY KEY (platform_number, cycle_number, n_levels, profile_time);
+CREATE INDEX IF NOT EXISTS measurements_profile_time_brin ON measurements USING brin (profile_time);
+
+DROP TABLE measurements_unpartitioned;
+
+COMMIT;
+
+ANALYZE measurements;
@@ -0,0 +1,18 @@
+----------------------------------------------------------------------
+-- One-off migration: retires an 'rtraj' table loaded before trajectory files had their own layout.
+-- That table has no key (re-ingesting a file duplicated its rows) and only kept the first value of each
+-- N_MEASUREMENT variable per cycle, so it cannot be converted; its files have to be ingested again.
+-- New databases do not need this. Run it with the ETL stopped, then move the *_Rtraj.nc files from
+-- processed\processed_rtraj_files back to nc_files\rtraj_files.
+----------------------------------------------------------------------
+BEGIN;
+
+ALTER TABLE rtraj RENAME TO rtraj_unkeyed;
+
+-- Forget the trajectory files in the manifest, so the ETL loads them again instead of skipping them
+DELETE FROM processedfiles WHERE filename ILIKE '%rtraj.nc';
+
+COMMIT;
+
+-- Once the files are re-ingested:
+-- DROP TABLE rtraj_unkeyed;
@@ -0,0 +1,5 @@
+"""Shared setup; run the suite from argo_db/ with python -m pytest tests."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
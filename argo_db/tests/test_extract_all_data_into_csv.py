@@ -0,0 +1,71 @@
+import netCDF4
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+import extract_all_data_into_csv as extract
+from extract_all_data_into_csv import OUTPUT_SCHEMA, extract_all, extract_measurements_from_file
+
+FILL = 99999.0
+PRES = [[5.0, 10.0, FILL], [4.0, 8.0, 12.0]]
+TEMP = [[28.1, 27.9, FILL], [29.0, 28.5, 28.0]]
+
+
+def write_prof_file(path, platform, juld_units="days since 1950-01-01 00:00:00 UTC", adjusted=True):
+    """A two-profile Argo-style file; juld_units=None leaves JULD out, "" keeps it without units."""
+    with netCDF4.Dataset(path, "w") as nc:
+        nc.createDimension("N_PROF", 2)
+        nc.createDimension("N_LEVELS", 3)
+        nc.createDimension("STRING8", 8)
+        number = nc.createVariable("PLATFORM_NUMBER", "S1", ("N_PROF", "STRING8"))
+        number[:] = netCDF4.stringtochar(np.array([f"{platform:<8}"] * 2, dtype="S8"))
+        nc.createVariable("CYCLE_NUMBER", "i4", ("N_PROF",))[:] = [1, 2]
+        if juld_units is not None:
+            juld = nc.createVariable("JULD", "f8", ("N_PROF",), fill_value=999999.0)
+            if juld_units:
+                juld.units = juld_units
+            juld[:] = np.ma.masked_array([27406.5, 0.0], mask=[False, True])
+        names = ["PRES", "TEMP"] + (["PRES_ADJUSTED", "TEMP_ADJUSTED"] if adjusted else [])
+        for name in names:
+            variable = nc.createVariable(name, "f4", ("N_PROF", "N_LEVELS"), fill_value=FILL)
+            variable[:] = np.ma.masked_equal(np.array(PRES if name.startswith("PRES") else TEMP, dtype="f4"), FILL)
+    return str(path)
+
+
+@pytest.fixture
+def prof_files(tmp_path):
+    return [
+        write_prof_file(tmp_path / "full.nc", "1900001"),
+        write_prof_file(tmp_path / "no_juld.nc", "1900002", juld_units=None, adjusted=False),
+        write_prof_file(tmp_path / "raw_juld.nc", "1900003", juld_units=""),
+    ]
+
+
+def test_extract_measurements_types_every_column(prof_files):
+    for path in prof_files:
+        _, df, error = extract_measurements_from_file(path)
+        assert error is None and list(df.columns) == OUTPUT_SCHEMA.names
+        assert len(df) == 5  # the padding level of the first profile is dropped
+        assert df["juld"].dtype.kind == "M" and df["pres_adjusted"].dtype == np.float32
+    _, df, _ = extract_measurements_from_file(prof_files[1])
+    assert df["juld"].isna().all() and df["pres_adjusted"].isna().all()
+    _, df, _ = extract_measurements_from_file(prof_files[2])
+    # Undecoded JULD is read as days since 1950-01-01; the fill value stays missing
+    assert df["juld"].iloc[0] == pd.Timestamp("2025-01-13 12:00") and df["juld"].iloc[-1] is pd.NaT
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "csv"])
+def test_extract_all_keeps_files_missing_variables(prof_files, tmp_path, monkeypatch, output_format):
+    monkeypatch.setattr(extract, "WORKERS", 2)
+    output = str(tmp_path / f"measurements.{output_format}")
+    rows, files_with_data, preview = extract_all(prof_files, output, output_format)
+    assert (rows, files_with_data, len(preview)) == (15, 3, 5)
+    if output_format == "parquet":
+        table = pq.read_table(output)
+        assert table.schema == OUTPUT_SCHEMA and table.num_rows == 15
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(output, dtype={"platform_number": str})
+    assert sorted(df["platform_number"].unique()) == ["1900001", "1900002", "1900003"]
+    assert df["juld"].notna().sum() == 4  # the first profile (two levels) of the files with JULD
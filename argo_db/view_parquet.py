@@ -1,15 +1,28 @@
 import polars as pl
 
-# The path to your output file
-file_path = r"E:\argo_db\model_training_data_final.parquet"
+from parquet_dataset import DATASET_PATH, count_rows, scan
 
-print(f"📄 Loading data from {file_path}")
+# --- CONFIGURATION ---
+# The dataset written by extract_training_data.py
+dataset_path = DATASET_PATH
+# Optional filters; None reads everything. Only the matching partitions and row groups are read.
+# START/END are datetimes (add "from datetime import datetime" above to use the examples).
+START = None        # e.g. datetime(2023, 3, 1)
+END = None          # e.g. datetime(2023, 4, 1), exclusive
+BBOX = None         # (lat_min, lat_max, lon_min, lon_max), e.g. (-10, 10, 60, 90)
+PLATFORMS = None    # e.g. ["7902246"]
+COLUMNS = None      # e.g. ["platform_number", "cycle_number", "profile_time", "pres", "temp", "psal"]
+PREVIEW_ROWS = 20
 
-# Load the entire Parquet file into a DataFrame
-df = pl.read_parquet(file_path)
+print(f"📄 Scanning {dataset_path}")
 
-# Print the full DataFrame to the console
-print(df)
+lazy = scan(dataset_path, start=START, end=END, bbox=BBOX, platforms=PLATFORMS)
+if COLUMNS:
+    lazy = lazy.select(COLUMNS)
 
-# Print a summary
-print(f"\nSummary: {df.height} rows, {df.width} columns")
\ No newline at end of file
+# Only the first rows are read and printed
+with pl.Config(tbl_cols=-1):
+    print(lazy.head(PREVIEW_ROWS).collect())
+
+print(f"\nSummary: {count_rows(dataset_path, start=START, end=END, bbox=BBOX, platforms=PLATFORMS)} matching rows, "
+      f"{len(lazy.collect_schema())} columns")
@@ -0,0 +1,18 @@
+"""Database access shared by the backend tools."""
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    """Pooled engine for POSTGRES_DSN from .env, created on first use."""
+    dsn = os.environ.get("POSTGRES_DSN")
+    if not dsn:
+        raise RuntimeError("POSTGRES_DSN is not set (see .env.example).")
+    return create_engine(dsn, pool_pre_ping=True)
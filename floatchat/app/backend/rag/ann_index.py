@@ -0,0 +1,304 @@
+"""In-process approximate nearest-neighbour index over the profile embeddings (VECTOR_BACKEND=ann in .env).
+
+The index is exported from the Chroma profile collection into plain .npy files under CHROMA_PATH/ann_profiles:
+
+    vectors.npy              float16 (N, dim) unit vectors, rows grouped by IVF list
+    centroids.npy            float32 (lists, dim) k-means centroids
+    offsets.npy              int64 (lists + 1): list i holds rows offsets[i]:offsets[i + 1]
+    platform.npy, cycle.npy, time.npy, latitude.npy, longitude.npy
+                             companion metadata, one entry per row, for the pre-filters
+    ids.npy, documents.bin, document_offsets.npy
+                             Chroma ids and the summaries (utf-8, sliced by offset)
+
+Every file is opened with np.load(mmap_mode="r"), so loading costs milliseconds and pages come in on demand.
+A query scores the centroids and then only the rows of the nprobe closest lists, as float32 dot products
+(cosine distance = 1 - dot). Filters on platform, time range and region are evaluated on the companion arrays
+first. When a filter leaves few rows, those rows are searched exactly; otherwise the filter is applied inside
+the probed lists, probing more lists until k rows are found.
+
+    python -m app.backend.rag.ann_index [--lists N] [--path DIR]    # (re)build from the Chroma collection
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.backend.vectorstore import chroma_path, get_profile_collection
+
+INDEX_DIR = "ann_profiles"
+CURRENT_FILE = "CURRENT"  # name of the live build directory; replaced atomically by each build
+DEFAULT_NPROBE = 8
+EXACT_FILTER_ROWS = 20_000  # filters leaving at most this many rows are searched exactly
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64  # k-means is fitted on a sample of this many rows per list
+EXPORT_PAGE = 5_000  # rows read from Chroma per request while building
+MISSING_TIME = np.iinfo(np.int64).min
+
+Bbox = tuple[float, float, float, float]  # (lat_min, lat_max, lon_min, lon_max); lon_min > lon_max crosses 180°
+
+
+def _epoch(value: str | None) -> int:
+    """Unix seconds of an ISO profile_time (naive = UTC); MISSING_TIME when there is none."""
+    if not value:
+        return MISSING_TIME
+    moment = datetime.fromisoformat(value)
+    return int((moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp())
+
+
+def kmeans(vectors: np.ndarray, lists: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (unit vectors) fitted on a sample of the rows."""
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), size=min(len(vectors), lists * KMEANS_SAMPLE_PER_LIST), replace=False)]
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = ~sums.any(axis=1)
+        # Lists that lost every row restart from random sample rows
+        sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids.astype(np.float32)
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+    """Nearest centroid of every row, computed a chunk at a time."""
+    return np.concatenate([
+        np.argmax(vectors[i:i + chunk].astype(np.float32) @ centroids.T, axis=1) for i in range(0, len(vectors), chunk)
+    ])
+
+
+def write_index(
+    path: Path,
+    ids: list[str],
+    vectors: np.ndarray,
+    metadatas: list[dict[str, Any]],
+    documents: list[str],
+    lists: int | None = None,
+) -> Path:
+    """Writes a new build under path and makes it the current one; returns its directory."""
+    if not len(ids):
+        raise ValueError("No profile embeddings to index; run python -m app.ingest.embed_profiles first.")
+    vectors = np.array(vectors, dtype=np.float32)  # a copy: normalised in place below
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    lists = lists or max(1, min(len(vectors), int(round(math.sqrt(len(vectors))))))
+    centroids = kmeans(vectors, lists)
+    assignment = assign(vectors, centroids)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.searchsorted(assignment[order], np.arange(lists + 1)).astype(np.int64)
+
+    build = path / f"build-{time.time_ns()}"
+    build.mkdir(parents=True)
+    np.save(build / "vectors.npy", vectors[order].astype(np.float16))
+    np.save(build / "centroids.npy", centroids)
+    np.save(build / "offsets.npy", offsets)
+    metadatas = [metadatas[i] or {} for i in order]
+    np.save(build / "ids.npy", np.array([ids[i] for i in order], dtype=str))
+    np.save(build / "platform.npy", np.array([str(m.get("platform_number", "")) for m in metadatas], dtype=str))
+    np.save(build / "cycle.npy", np.array([m.get("cycle_number", -1) for m in metadatas], dtype=np.int64))
+    np.save(build / "time.npy", np.array([_epoch(m.get("profile_time")) for m in metadatas], dtype=np.int64))
+    for field in ("latitude", "longitude"):
+        np.save(build / f"{field}.npy", np.array([m.get(field, np.nan) for m in metadatas], dtype=np.float64))
+    encoded = [documents[i].encode() if documents[i] else b"" for i in order]
+    np.save(build / "document_offsets.npy", np.concatenate([[0], np.cumsum([len(d) for d in encoded])]).astype(np.int64))
+    (build / "documents.bin").write_bytes(b"".join(encoded))
+    (build / "manifest.json").write_text(json.dumps({"rows": len(vectors), "dim": vectors.shape[1], "lists": lists}))
+
+    current = path / CURRENT_FILE
+    previous = current.read_text().strip() if current.exists() else None
+    tmp = path / (CURRENT_FILE + ".tmp")
+    tmp.write_text(build.name)
+    os.replace(tmp, current)
+    # The previous build stays: a process may have read CURRENT just before the swap and not mapped it yet.
+    # Older ones go (ignoring errors: on Windows a build still mapped somewhere is removed by a later run).
+    for stale in path.glob("build-*"):
+        if stale.name not in (build.name, previous):
+            shutil.rmtree(stale, ignore_errors=True)
+    return build
+
+
+def build_index(path: Path | None = None, lists: int | None = None) -> Path:
+    """Exports the Chroma profile collection (embeddings, metadata, summaries) into a new index build."""
+    collection = get_profile_collection()
+    ids, vectors, metadatas, documents = [], [], [], []
+    for offset in range(0, collection.count(), EXPORT_PAGE):
+        page = collection.get(limit=EXPORT_PAGE, offset=offset, include=["embeddings", "metadatas", "documents"])
+        ids += page["ids"]
+        vectors.append(np.asarray(page["embeddings"], dtype=np.float32))
+        metadatas += page["metadatas"]
+        documents += page["documents"]
+    matrix = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+    return write_index(path or chroma_path() / INDEX_DIR, ids, matrix, metadatas, documents, lists)
+
+
+class AnnIndex:
+    """A memory-mapped index build; search() answers top-k queries in-process."""
+
+    def __init__(self, build: Path):
+        self.build = build
+        load = lambda name: np.load(build / f"{name}.npy", mmap_mode="r")
+        self.vectors, self.centroids, self.offsets = load("vectors"), np.asarray(load("centroids")), np.asarray(load("offsets"))
+        self.ids, self.platform, self.cycle = load("ids"), load("platform"), load("cycle")
+        self.time, self.latitude, self.longitude = load("time"), load("latitude"), load("longitude")
+        self.document_offsets = load("document_offsets")
+        self.documents = np.memmap(build / "documents.bin", dtype=np.uint8, mode="r") if self.document_offsets[-1] else None
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _mask(self, rows: slice | np.ndarray, platform: str | None, start: int | None, end: int | None, bbox: Bbox | None) -> np.ndarray | None:
+        """Pre-filter over the given rows of the companion arrays; None when there is no filter."""
+        mask = None
+
+        def both(condition: np.ndarray) -> np.ndarray:
+            return condition if mask is None else mask & condition
+
+        if platform is not None:
+            mask = both(self.platform[rows] == platform)
+        if start is not None or end is not None:
+            times = self.time[rows]
+            mask = both(times != MISSING_TIME)
+            if start is not None:
+                mask &= times >= start
+            if end is not None:
+                mask &= times < end
+        if bbox is not None:
+            lat_min, lat_max, lon_min, lon_max = bbox
+            lat, lon = self.latitude[rows], self.longitude[rows]
+            in_lon = (lon >= lon_min) & (lon <= lon_max) if lon_min <= lon_max else (lon >= lon_min) | (lon <= lon_max)
+            mask = both((lat >= lat_min) & (lat <= lat_max) & in_lon)
+        return mask
+
+    @staticmethod
+    def _top(rows: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """The k best (row, score) pairs, best first."""
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        nprobe: int = DEFAULT_NPROBE,
+        platform: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        bbox: Bbox | None = None,
+    ) -> list[tuple[int, float]]:
+        """(row, cosine distance) of the k nearest rows passing the filters, nearest first."""
+        if not len(self) or k <= 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        start_s = int(start.timestamp()) if start is not None else None
+        end_s = int(end.timestamp()) if end is not None else None
+        filtered = any(f is not None for f in (platform, start, end, bbox))
+        if filtered:
+            selected = np.flatnonzero(self._mask(slice(None), platform, start_s, end_s, bbox))
+            if len(selected) <= EXACT_FILTER_ROWS:
+                scores = self.vectors[selected].astype(np.float32) @ query
+                rows, scores = self._top(selected, scores, k)
+                return [(int(r), float(1 - s)) for r, s in zip(rows, scores)]
+
+        list_order = np.argsort(-(self.centroids @ query))
+        probed, found_rows, found_scores = 0, [], []
+        while probed < len(list_order):
+            for cell in list_order[probed:probed + nprobe]:
+                a, b = int(self.offsets[cell]), int(self.offsets[cell + 1])
+                if a == b:
+                    continue
+                rows = np.arange(a, b)
+                block = self.vectors[a:b]
+                if filtered:
+                    mask = self._mask(slice(a, b), platform, start_s, end_s, bbox)
+                    rows, block = rows[mask], block[mask]
+                if len(rows):
+                    found_rows.append(rows)
+                    found_scores.append(block.astype(np.float32) @ query)
+            probed += nprobe
+            if sum(len(r) for r in found_rows) >= k:
+                break
+            nprobe *= 2  # a selective filter left too few rows in the closest lists
+        if not found_rows:
+            return []
+        rows, scores = self._top(np.concatenate(found_rows), np.concatenate(found_scores), k)
+        return [(int(r), float(1 - s)) for r, s in zip(rows, scores)]
+
+    def exact_search(self, query: np.ndarray, k: int = 10, **filters: Any) -> list[tuple[int, float]]:
+        """Brute force over every row passing the filters (the benchmark's ground truth)."""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        start, end = filters.get("start"), filters.get("end")
+        mask = self._mask(
+            slice(None), filters.get("platform"),
+            int(start.timestamp()) if start is not None else None, int(end.timestamp()) if end is not None else None,
+            filters.get("bbox"),
+        )
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        vectors = self.vectors if mask is None else self.vectors[rows]
+        scores = np.concatenate([
+            vectors[i:i + 65_536].astype(np.float32) @ query for i in range(0, len(rows), 65_536)
+        ]) if len(rows) else np.zeros(0, dtype=np.float32)
+        rows, scores = self._top(rows, scores, k)
+        return [(int(r), float(1 - s)) for r, s in zip(rows, scores)]
+
+    def hit(self, row: int, distance: float) -> dict[str, Any]:
+        """A search result in the shape vector_search returns."""
+        a, b = int(self.document_offsets[row]), int(self.document_offsets[row + 1])
+        hit: dict[str, Any] = {
+            "id": str(self.ids[row]),
+            "summary": bytes(self.documents[a:b]).decode() if self.documents is not None else "",
+            "distance": distance,
+            "platform_number": str(self.platform[row]),
+            "cycle_number": int(self.cycle[row]),
+        }
+        for field in ("latitude", "longitude"):
+            value = float(getattr(self, field)[row])
+            if not math.isnan(value):
+                hit[field] = value
+        if self.time[row] != MISSING_TIME:
+            hit["profile_time"] = datetime.fromtimestamp(int(self.time[row]), tz=timezone.utc).isoformat()
+        return hit
+
+
+@lru_cache(maxsize=4)
+def _open(build: Path) -> AnnIndex:
+    """One mapping per build directory and process."""
+    return AnnIndex(build)
+
+
+def get_index(path: Path | None = None) -> AnnIndex:
+    """The current build, mapped once per process; a newer build is picked up on the next call."""
+    path = path or chroma_path() / INDEX_DIR
+    current = path / CURRENT_FILE
+    if not current.exists():
+        raise RuntimeError(f"No ANN index in {path}; build it with python -m app.backend.rag.ann_index.")
+    return _open(path / current.read_text().strip())
+
+
+def main() -> None:
+    """Command line entry point: builds the index and prints its size."""
+    parser = argparse.ArgumentParser(description="Build the in-process ANN index from the Chroma profile collection.")
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default: about sqrt(profiles))")
+    parser.add_argument("--path", type=Path, default=None, help="index directory (default: CHROMA_PATH/ann_profiles)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    build = build_index(args.path, args.lists)
+    manifest = json.loads((build / "manifest.json").read_text())
+    print(f"ANN index: {manifest['rows']:,} profiles in {manifest['lists']} lists -> {build} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Text embedding models for the profile vectorstore.
+
+The model is chosen by EMBEDDING_MODEL in .env and must be the same for building the store
+(app/ingest/embed_profiles.py) and for searching it (mcp_tools.vector_search):
+
+    hashing                                   -> feature hashing, offline and deterministic (the default)
+    hashing:<dim>                             -> the same with another vector size
+    sentence-transformers:<model name/path>   -> a local sentence-transformers model (package installed separately)
+"""
+import hashlib
+import os
+import re
+from functools import lru_cache
+from typing import Protocol
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_MODEL = "hashing"
+HASHING_DIM = 384
+TOKEN = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+
+
+class Embedder(Protocol):
+    name: str  # full spec, stored with the vectors; a different name means the store has to be rebuilt
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) float32 array of unit vectors."""
+        ...
+
+
+class HashingEmbedder:
+    """Bag of words and word pairs hashed into dim buckets with a signed blake2b hash, then L2-normalised.
+
+    No model files or network; the same text gives the same vector in every process and on every machine.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def _features(self, text: str) -> list[str]:
+        """Lower-cased words and numbers of text, plus every pair of neighbouring ones."""
+        tokens = TOKEN.findall(text.lower())
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) float32 unit vectors; an empty text gives the zero vector."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                vectors[i, h % self.dim] += 1.0 if h >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class SentenceTransformerEmbedder:
+    """A local sentence-transformers model; loaded once per process."""
+
+    def __init__(self, model: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError("EMBEDDING_MODEL needs the sentence-transformers package (pip install sentence-transformers).") from e
+        self.model = SentenceTransformer(model)
+        self.name = f"sentence-transformers:{model}"
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) float32 unit vectors from the model."""
+        return self.model.encode(texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def create_embedder(spec: str) -> Embedder:
+    """A new embedder for an EMBEDDING_MODEL spec (see the module docstring)."""
+    kind, _, arg = spec.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(arg) if arg else HASHING_DIM)
+    if kind == "sentence-transformers" and arg:
+        return SentenceTransformerEmbedder(arg)
+    raise ValueError(f"Unknown EMBEDDING_MODEL '{spec}' (see app/backend/rag/embeddings.py).")
+
+
+@lru_cache(maxsize=None)
+def get_embedder(spec: str | None = None) -> Embedder:
+    """Embedder for spec, or for EMBEDDING_MODEL from .env; created once per process."""
+    return create_embedder(spec or os.environ.get("EMBEDDING_MODEL", DEFAULT_MODEL))
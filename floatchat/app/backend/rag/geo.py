@@ -0,0 +1,103 @@
+"""Grid-cell spatial lookup over profile positions, without PostGIS.
+
+The ingest stores a geo_cell id per profile (argo_db/etl_argo.py, GEO_CELL_DEG degree cells) with a B-tree
+index on it. A search first turns the search circle into ranges of cell ids (index range scans), then
+refines the candidates by great-circle distance.
+"""
+import math
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Must match GEO_CELL_DEG in argo_db/etl_argo.py, which computes the ids at ingest.
+GEO_CELL_DEG = 1.0
+CELL_ROWS = int(round(180 / GEO_CELL_DEG))
+CELL_COLS = int(round(360 / GEO_CELL_DEG))
+EARTH_RADIUS_KM = 6371.0088
+MAX_RADIUS_KM = math.pi * EARTH_RADIUS_KM  # half the circumference covers the whole globe
+
+# Great-circle distance (haversine) from (:lat, :lon) to the row's position, in km
+DISTANCE_SQL = (
+    f"2 * {EARTH_RADIUS_KM} * asin(least(1, sqrt("
+    "power(sin(radians(latitude - :lat) / 2), 2)"
+    " + cos(radians(:lat)) * cos(radians(latitude)) * power(sin(radians(longitude - :lon) / 2), 2))))"
+)
+
+
+def cell_id(lat: float, lon: float) -> int:
+    """Grid cell of one position, the same id the ingest stores in geo_cell."""
+    row = min(max(math.floor((lat + 90) / GEO_CELL_DEG), 0), CELL_ROWS - 1)
+    col = math.floor(((lon + 180) % 360) / GEO_CELL_DEG) % CELL_COLS
+    return row * CELL_COLS + col
+
+
+def cell_ranges(lat: float, lon: float, radius_km: float) -> list[tuple[int, int]]:
+    """Inclusive geo_cell id ranges covering every point within radius_km of (lat, lon).
+
+    One range per grid row (two where the circle crosses the antimeridian); rows whose whole
+    circle of latitude is covered are merged into a single range.
+    """
+    angle = min(radius_km / EARTH_RADIUS_KM, math.pi)
+    dlat = math.degrees(angle)
+    row_lo = min(max(math.floor((lat - dlat + 90) / GEO_CELL_DEG), 0), CELL_ROWS - 1)
+    row_hi = min(max(math.floor((lat + dlat + 90) / GEO_CELL_DEG), 0), CELL_ROWS - 1)
+    # Longitude half-width of the spherical cap; the cap holds a pole when sin(angle) >= cos(lat)
+    cos_lat = math.cos(math.radians(lat))
+    if lat - dlat <= -90 or lat + dlat >= 90 or math.sin(angle) >= cos_lat:
+        return [(row_lo * CELL_COLS, (row_hi + 1) * CELL_COLS - 1)]
+    dlon = math.degrees(math.asin(math.sin(angle) / cos_lat))
+    col_lo = math.floor((lon - dlon + 180) / GEO_CELL_DEG)
+    col_hi = math.floor((lon + dlon + 180) / GEO_CELL_DEG)
+    if col_hi - col_lo + 1 >= CELL_COLS:
+        return [(row_lo * CELL_COLS, (row_hi + 1) * CELL_COLS - 1)]
+    col_lo, col_hi = col_lo % CELL_COLS, col_hi % CELL_COLS
+    spans = [(col_lo, col_hi)] if col_lo <= col_hi else [(col_lo, CELL_COLS - 1), (0, col_hi)]
+    return [(row * CELL_COLS + lo, row * CELL_COLS + hi) for row in range(row_lo, row_hi + 1) for lo, hi in spans]
+
+
+def search_profiles(
+    conn: Connection,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    per_float: bool = False,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Profiles within radius_km of (lat, lon), nearest first, optionally limited to [start, end).
+
+    Only the cells of the search circle are read through the geo_cell index; rows are then filtered and
+    ordered by great-circle distance. per_float keeps the nearest profile of each platform only.
+    """
+    ranges = cell_ranges(lat, lon, radius_km)
+    params: dict[str, Any] = {"lat": lat, "lon": lon, "radius_km": radius_km}
+    cell_filters = []
+    for i, (lo, hi) in enumerate(ranges):
+        cell_filters.append(f"geo_cell BETWEEN :cell_lo_{i} AND :cell_hi_{i}")
+        params[f"cell_lo_{i}"], params[f"cell_hi_{i}"] = lo, hi
+    filters = [f"({' OR '.join(cell_filters)})"]
+    if start is not None:
+        filters.append("profile_time >= :start")
+        params["start"] = start
+    if end is not None:
+        filters.append("profile_time < :end")
+        params["end"] = end
+    candidates = f"""
+        SELECT platform_number, cycle_number, latitude, longitude, profile_time, {DISTANCE_SQL} AS distance_km
+        FROM profiles WHERE {' AND '.join(filters)}"""
+    if per_float:
+        candidates = f"""
+            SELECT DISTINCT ON (platform_number) * FROM ({candidates}) c
+            WHERE distance_km <= :radius_km ORDER BY platform_number, distance_km"""
+    query = f"SELECT * FROM ({candidates}) c WHERE distance_km <= :radius_km ORDER BY distance_km"
+    if limit is not None:
+        query += " LIMIT :limit"
+        params["limit"] = limit
+    rows = conn.execute(text(query), params).mappings().all()
+    return [
+        {**row, "profile_time": row["profile_time"].isoformat() if row["profile_time"] else None}
+        for row in rows
+    ]
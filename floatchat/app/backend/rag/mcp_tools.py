@@ -0,0 +1,116 @@
+"""Tools the RAG backend exposes to the LLM over MCP."""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.backend.db import get_engine
+from app.backend.rag import ann_index, geo
+from app.backend.rag.embeddings import get_embedder
+from app.backend.vectorstore import get_profile_collection
+
+NEAREST_START_RADIUS_KM = 250.0  # first search ring of nearest_floats; grows 4x until enough floats are found
+
+
+def profiles_near(
+    lat: float,
+    lon: float,
+    radius_km: float = 100.0,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 200,
+) -> list[dict[str, Any]]:
+    """Profiles within radius_km of (lat, lon), nearest first, e.g. "salinity profiles near 0,0 in March 2023".
+
+    start/end bound profile_time (end exclusive). Each row has platform_number, cycle_number, latitude,
+    longitude, profile_time and distance_km.
+    """
+    with get_engine().connect() as conn:
+        return geo.search_profiles(conn, lat, lon, min(radius_km, geo.MAX_RADIUS_KM), start, end, limit=limit)
+
+
+def nearest_floats(
+    lat: float,
+    lon: float,
+    k: int = 5,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[dict[str, Any]]:
+    """The k floats that came closest to (lat, lon), each with its nearest profile, nearest first.
+
+    Searches a small circle first and widens it until k floats are inside; every float within the final
+    radius is a candidate, so the result is the exact k nearest.
+    """
+    radius_km = NEAREST_START_RADIUS_KM
+    with get_engine().connect() as conn:
+        while True:
+            floats = geo.search_profiles(conn, lat, lon, radius_km, start, end, per_float=True, limit=k)
+            if len(floats) >= k or radius_km >= geo.MAX_RADIUS_KM:
+                return floats
+            radius_km = min(radius_km * 4, geo.MAX_RADIUS_KM)
+
+
+def _month_range(month: str) -> tuple[datetime, datetime]:
+    """'2023-03' -> [2023-03-01, 2023-04-01) in UTC."""
+    first = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+    return first, (first + timedelta(days=32)).replace(day=1)
+
+
+def _chroma_where(
+    platform_number: str | None,
+    start: datetime | None,
+    end: datetime | None,
+    bbox: tuple[float, float, float, float] | None,
+) -> dict[str, Any] | None:
+    """Chroma where clause for the vector_search filters; None when there is none."""
+    filters: list[dict[str, Any]] = [{"platform_number": platform_number}] if platform_number else []
+    if start is not None:
+        filters.append({"profile_epoch": {"$gte": int(start.timestamp())}})
+    if end is not None:
+        filters.append({"profile_epoch": {"$lt": int(end.timestamp())}})
+    if bbox is not None:
+        lat_min, lat_max, lon_min, lon_max = bbox
+        filters += [{"latitude": {"$gte": lat_min}}, {"latitude": {"$lte": lat_max}}]
+        if lon_min <= lon_max:
+            filters += [{"longitude": {"$gte": lon_min}}, {"longitude": {"$lte": lon_max}}]
+        else:
+            filters.append({"$or": [{"longitude": {"$gte": lon_min}}, {"longitude": {"$lte": lon_max}}]})
+    return filters[0] if len(filters) == 1 else {"$and": filters} if filters else None
+
+
+def vector_search(
+    query: str,
+    k: int = 10,
+    platform_number: str | None = None,
+    month: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+) -> list[dict[str, Any]]:
+    """The k profile summaries closest in meaning to query, e.g. "ARVOR floats of Argo INDIA in delayed mode".
+
+    platform_number, month ("2023-03") or start/end (end exclusive, timezone-aware) and bbox
+    (lat_min, lat_max, lon_min, lon_max) narrow the search. Each hit has id, summary and distance plus the
+    profile's platform_number, cycle_number, latitude, longitude and profile_time. VECTOR_BACKEND=ann in .env
+    answers from the in-process index (app/backend/rag/ann_index.py) instead of Chroma.
+    """
+    if month:
+        start, end = _month_range(month)
+    vector = get_embedder().embed([query])[0]
+    if os.environ.get("VECTOR_BACKEND", "chroma") == "ann":
+        index = ann_index.get_index()
+        rows = index.search(vector, k, platform=platform_number, start=start, end=end, bbox=bbox)
+        return [index.hit(row, distance) for row, distance in rows]
+
+    result = get_profile_collection().query(
+        query_embeddings=[vector.tolist()],
+        n_results=k,
+        where=_chroma_where(platform_number, start, end, bbox),
+        include=["documents", "metadatas", "distances"],
+    )
+    hits = []
+    for id_, summary, metadata, distance in zip(
+        result["ids"][0], result["documents"][0], result["metadatas"][0], result["distances"][0]
+    ):
+        metadata = {key: value for key, value in (metadata or {}).items() if key not in ("content_hash", "profile_epoch")}
+        hits.append({"id": id_, "summary": summary, "distance": distance, **metadata})
+    return hits
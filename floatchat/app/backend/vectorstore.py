@@ -0,0 +1,30 @@
+"""Chroma vectorstore shared by the embedding builder and the backend tools."""
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import chromadb
+from chromadb.api.models.Collection import Collection
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILE_COLLECTION = "profile_summaries"
+
+
+def chroma_path() -> Path:
+    """Directory of the persistent Chroma store (CHROMA_PATH in .env, ./vectorstore by default)."""
+    return Path(os.environ.get("CHROMA_PATH", "./vectorstore"))
+
+
+@lru_cache(maxsize=1)
+def get_client() -> chromadb.ClientAPI:
+    """Persistent client on CHROMA_PATH from .env, created on first use."""
+    return chromadb.PersistentClient(path=str(chroma_path()))
+
+
+def get_profile_collection() -> Collection:
+    """Collection of per-profile summaries; vectors are supplied by app/backend/rag/embeddings.py, not by Chroma."""
+    return get_client().get_or_create_collection(
+        PROFILE_COLLECTION, metadata={"hnsw:space": "cosine"}, embedding_function=None
+    )
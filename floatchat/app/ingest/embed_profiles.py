@@ -0,0 +1,273 @@
+"""Builds the Chroma vectorstore of per-profile summaries (DM5), incrementally.
+
+Every profile gets a short text summary built from profiles joined with meta, embedded with the EMBEDDING_MODEL
+(app/backend/rag/embeddings.py) and upserted into the profile collection with its position and time as metadata.
+
+A run only looks at the floats whose files the ETL processed since the previous run (processedfiles.processed_at
+after the watermark kept in CHROMA_PATH/embed_state.json). Of those profiles, only the ones whose summary hash
+differs from the stored one are embedded, and identical summaries are embedded once. So a run after an ETL
+batch costs time in proportion to that batch. The first run and --full check every profile; a change of
+EMBEDDING_MODEL re-embeds everything. Embedding runs on a process pool in EMBED_BATCH-sized batches, and upserts go to Chroma in bulk.
+
+    python -m app.ingest.embed_profiles [--full] [--workers N]
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.backend.db import get_engine
+from app.backend.rag import ann_index
+from app.backend.rag.embeddings import get_embedder
+from app.backend.vectorstore import PROFILE_COLLECTION, chroma_path, get_client, get_profile_collection
+
+STATE_FILE = "embed_state.json"
+CHUNK_ROWS = 20_000  # profiles read from PostgreSQL at a time
+EMBED_BATCH = 1_024  # texts per embedding task
+WATERMARK_OVERLAP = timedelta(minutes=10)  # ETL transactions still open when the watermark was read commit within this
+
+PROFILE_FIELDS = [
+    "platform_number", "cycle_number", "direction", "profile_time", "latitude", "longitude", "geo_cell",
+    "data_mode", "project_name", "pi_name", "platform_type", "data_centre", "positioning_system",
+]
+META_FIELDS = ["platform_maker", "operating_institution", "float_owner", "deployment_cruise_id", "launch_date"]
+DIRECTIONS = {"A": "ascending", "D": "descending"}
+DATA_MODES = {"R": "real-time", "A": "real-time adjusted", "D": "delayed-mode"}
+
+
+def _value(row: dict[str, Any], field: str) -> Any:
+    """row[field], with NULL, NaN and empty strings all as None."""
+    value = row.get(field)
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value == "":
+        return None
+    return value
+
+
+def summarize(row: dict[str, Any]) -> str:
+    """One profile as a sentence or two of plain text, e.g. for "salinity profiles near 0,0 in March 2023"."""
+    cycle = _value(row, "cycle_number")
+    parts = [f"Argo float {row['platform_number']} profile {int(cycle) if cycle is not None else '?'}"]
+    if _value(row, "direction") in DIRECTIONS:
+        parts[0] += f" ({DIRECTIONS[row['direction']]})"
+    when = _value(row, "profile_time")
+    if when is not None:
+        parts.append(f"measured {when:%d %B %Y %H:%M} UTC")
+    lat, lon = _value(row, "latitude"), _value(row, "longitude")
+    if lat is not None and lon is not None:
+        parts.append(f"at {abs(lat):.3f}°{'N' if lat >= 0 else 'S'} {abs(lon):.3f}°{'E' if lon >= 0 else 'W'}")
+    summary = ", ".join(parts) + "."
+    details = [
+        f"{label} {_value(row, field)}"
+        for label, field in [
+            ("Project", "project_name"), ("PI", "pi_name"), ("data centre", "data_centre"),
+            ("platform", "platform_type"), ("made by", "platform_maker"), ("operated by", "operating_institution"),
+            ("owned by", "float_owner"), ("deployment cruise", "deployment_cruise_id"),
+            ("positioning", "positioning_system"),
+        ]
+        if _value(row, field) is not None
+    ]
+    if _value(row, "data_mode") in DATA_MODES:
+        details.append(f"{DATA_MODES[row['data_mode']]} data")
+    return summary + (" " + ", ".join(details) + "." if details else "")
+
+
+def content_hash(model: str, summary: str) -> str:
+    """Hash stored with each vector; a new summary or a new model changes it, so the profile is embedded again."""
+    return hashlib.blake2b(f"{model}\n{summary}".encode(), digest_size=16).hexdigest()
+
+
+def profile_id(row: dict[str, Any]) -> str:
+    """Chroma id of a profile, "<platform_number>:<cycle_number>"."""
+    return f"{row['platform_number']}:{int(row['cycle_number'])}"
+
+
+def profile_metadata(row: dict[str, Any], digest: str) -> dict[str, Any]:
+    """Chroma metadata of a profile (filterable in vector_search); Chroma takes no None values."""
+    metadata = {"content_hash": digest, "platform_number": str(row["platform_number"]), "cycle_number": int(row["cycle_number"])}
+    for field in ("latitude", "longitude"):
+        if _value(row, field) is not None:
+            metadata[field] = float(row[field])
+    if _value(row, "geo_cell") is not None:
+        metadata["geo_cell"] = int(row["geo_cell"])
+    if _value(row, "profile_time") is not None:
+        metadata["profile_time"] = row["profile_time"].isoformat()
+        metadata["profile_epoch"] = int(row["profile_time"].timestamp())  # Chroma range filters need numbers
+    return metadata
+
+
+def _existing_columns(conn: Connection, table: str) -> set[str]:
+    """Column names of a public table; empty when the table does not exist."""
+    rows = conn.execute(
+        text("SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name = :table"),
+        {"table": table},
+    )
+    return {row[0] for row in rows}
+
+
+def profile_rows(conn: Connection, platforms: list[str] | None) -> Iterable[list[dict[str, Any]]]:
+    """profiles LEFT JOIN meta, CHUNK_ROWS rows at a time through a server-side cursor; all floats when platforms is None.
+
+    The ETL adds columns as files bring them, so fields a table does not have (yet) are selected as NULL.
+    """
+    profile_cols, meta_cols = _existing_columns(conn, "profiles"), _existing_columns(conn, "meta")
+    select = [f'p."{f}"' if f in profile_cols else f'NULL AS "{f}"' for f in PROFILE_FIELDS]
+    select += [f'm."{f}"' if f in meta_cols else f'NULL AS "{f}"' for f in META_FIELDS]
+    join = "LEFT JOIN meta m ON m.platform_number = p.platform_number" if meta_cols else ""
+    where = "WHERE p.cycle_number IS NOT NULL"
+    params: dict[str, Any] = {}
+    if platforms is not None:
+        where += " AND p.platform_number = ANY(:platforms)"
+        params["platforms"] = platforms
+    query = f"SELECT {', '.join(select)} FROM profiles p {join} {where}"
+    result = conn.execution_options(stream_results=True, max_row_buffer=CHUNK_ROWS).execute(text(query), params)
+    for chunk in result.mappings().partitions(CHUNK_ROWS):
+        yield [dict(row) for row in chunk]
+
+
+def _load_state() -> dict[str, Any]:
+    """Model and watermark of the previous run; empty before the first one."""
+    path = chroma_path() / STATE_FILE
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _save_state(state: dict[str, Any]) -> None:
+    """Writes the state file atomically (temp file, then rename)."""
+    path = chroma_path() / STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, path)
+
+
+def changed_floats(conn: Connection, watermark: str | None) -> tuple[list[str] | None, str | None]:
+    """(floats with files processed after watermark, new watermark). None for the floats means all of them:
+    the first run, or a database without the ETL's processedfiles manifest."""
+    if conn.execute(text("SELECT to_regclass('public.processedfiles')")).scalar() is None:
+        return None, None
+    latest = conn.execute(text("SELECT max(processed_at) FROM processedfiles")).scalar()
+    new_watermark = latest.isoformat() if latest else watermark
+    if watermark is None:
+        return None, new_watermark
+    since = datetime.fromisoformat(watermark) - WATERMARK_OVERLAP
+    # <wmo>_prof.nc, <wmo>_meta.nc, ... and per-cycle files with a data-mode prefix: R<wmo>_001.nc, BD<wmo>_001D.nc
+    rows = conn.execute(
+        text(
+            "SELECT DISTINCT regexp_replace(split_part(filename, '_', 1), '^[BSDR]+', '') "
+            "FROM processedfiles WHERE processed_at > :since"
+        ),
+        {"since": since},
+    )
+    return [row[0] for row in rows], new_watermark
+
+
+def _embed_batch(spec: str, texts: list[str]) -> np.ndarray:
+    """Pool task: embeds one batch with the worker's (cached) model."""
+    return get_embedder(spec).embed(texts)
+
+
+class BatchEmbedder:
+    """Embeds texts in EMBED_BATCH batches, on a process pool when there is more than one batch."""
+
+    def __init__(self, spec: str, workers: int | None):
+        self.spec, self.workers = spec, workers
+        self.pool: ProcessPoolExecutor | None = None
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """(len(texts), dim) vectors, in the order of texts."""
+        batches = [texts[i:i + EMBED_BATCH] for i in range(0, len(texts), EMBED_BATCH)]
+        if len(batches) <= 1 or self.workers == 1:
+            return np.vstack([_embed_batch(self.spec, batch) for batch in batches])
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return np.vstack(list(self.pool.map(_embed_batch, [self.spec] * len(batches), batches)))
+
+    def close(self) -> None:
+        """Shuts the pool down, if one was started."""
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def _upsert(collection, ids, embeddings, documents, metadatas) -> None:
+    """Upserts in slices of the largest batch the Chroma client accepts."""
+    step = get_client().get_max_batch_size()
+    for i in range(0, len(ids), step):
+        collection.upsert(
+            ids=ids[i:i + step], embeddings=embeddings[i:i + step],
+            documents=documents[i:i + step], metadatas=metadatas[i:i + step],
+        )
+
+
+def update_vectorstore(full: bool = False, workers: int | None = None, spec: str | None = None) -> dict[str, int]:
+    """Brings the profile collection up to date; returns counts of profiles scanned, embedded and unchanged."""
+    model = get_embedder(spec).name
+    state = _load_state()
+    rebuild = state.get("model") != model
+    if rebuild and state:
+        # Vectors of another model are not comparable; start over
+        print(f"Embedding model changed ({state.get('model')} -> {model}); rebuilding the vectorstore.")
+        get_client().delete_collection(PROFILE_COLLECTION)
+    collection = get_profile_collection()
+    stats = {"scanned": 0, "embedded": 0, "unchanged": 0}
+    embedder = BatchEmbedder(model, workers)
+    try:
+        with get_engine().connect() as conn:
+            platforms, watermark = changed_floats(conn, None if full or rebuild else state.get("watermark"))
+            if platforms == []:
+                return stats
+            for rows in profile_rows(conn, platforms):
+                ids = [profile_id(row) for row in rows]
+                summaries = [summarize(row) for row in rows]
+                digests = [content_hash(model, summary) for summary in summaries]
+                stored = {}
+                if not rebuild:
+                    known = collection.get(ids=ids, include=["metadatas"])
+                    stored = {i: (m or {}).get("content_hash") for i, m in zip(known["ids"], known["metadatas"])}
+                todo = [k for k, (i, d) in enumerate(zip(ids, digests)) if stored.get(i) != d]
+                stats["scanned"] += len(rows)
+                stats["unchanged"] += len(rows) - len(todo)
+                if not todo:
+                    continue
+                # Profiles with the same summary share one embedding
+                unique = {digests[k]: summaries[k] for k in todo}
+                vectors = dict(zip(unique, embedder.embed(list(unique.values()))))
+                _upsert(
+                    collection,
+                    [ids[k] for k in todo],
+                    [vectors[digests[k]].tolist() for k in todo],
+                    [summaries[k] for k in todo],
+                    [profile_metadata(rows[k], digests[k]) for k in todo],
+                )
+                stats["embedded"] += len(todo)
+    finally:
+        embedder.close()
+    _save_state({"model": model, "watermark": watermark})
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Embed per-profile summaries into the Chroma vectorstore.")
+    parser.add_argument("--full", action="store_true", help="re-check every profile, not only recently ingested floats")
+    parser.add_argument("--workers", type=int, default=None, help="embedding processes (default: one per CPU)")
+    args = parser.parse_args()
+    stats = update_vectorstore(full=args.full, workers=args.workers)
+    print(
+        f"Vectorstore: {stats['embedded']:,} profiles embedded, {stats['unchanged']:,} unchanged "
+        f"({stats['scanned']:,} scanned) -> {chroma_path()}"
+    )
+    if os.environ.get("VECTOR_BACKEND", "chroma") == "ann":
+        current = chroma_path() / ann_index.INDEX_DIR / ann_index.CURRENT_FILE
+        if stats["embedded"] or not current.exists():
+            print(f"ANN index rebuilt -> {ann_index.build_index()}")
+
+
+if __name__ == "__main__":
+    main()
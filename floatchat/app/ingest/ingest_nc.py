@@ -0,0 +1,241 @@
+"""NetCDF -> Parquet ingest for Argo profile files (data/raw/*.nc -> data/processed/*.parquet).
+
+to_rows() reads a file a slab of profiles at a time and yields pyarrow RecordBatches with one row per profile
+and depth level. Numeric variables go into Arrow straight from the NumPy buffers netCDF4 reads: (N_PROF, N_LEVELS)
+arrays are flattened with a reshape (a view) and wrapped as Arrow buffers, with the fill-value mask as the validity
+bitmap, so nothing is converted row by row. Per-profile text (platform number, ...) is dictionary encoded, so each
+distinct value is stored once per batch instead of once per level. write_parquet() streams the batches through a
+ParquetWriter, and ingest_directory() converts a whole directory in a process pool, skipping files whose
+Parquet output is current.
+"""
+import argparse
+import os
+import re
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import netCDF4
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parents[2]
+RAW_DIR = ROOT / "data" / "raw"
+PROCESSED_DIR = ROOT / "data" / "processed"
+
+PROFILE_DIM = "N_PROF"
+LEVEL_DIM = "N_LEVELS"
+BATCH_PROFILES = 1024  # profiles read per slab; one RecordBatch each
+ROW_GROUP_ROWS = 512 * 1024
+COMPRESSION = "zstd"
+# Parquet key-value metadata identifying the source file an output was written from
+SOURCE_SIZE_KEY, SOURCE_MTIME_KEY = b"floatchat.source_size", b"floatchat.source_mtime"
+
+TIME_UNITS = re.compile(r"days since (\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}:\d{2}))?")
+
+
+def _validity(mask: np.ndarray) -> pa.Buffer | None:
+    """Arrow validity bitmap (1 = valid) from a NumPy mask (True = missing); None when nothing is missing."""
+    if not mask.any():
+        return None
+    return pa.py_buffer(np.packbits(~mask, bitorder="little"))
+
+
+def _numeric(values: np.ndarray, mask: np.ndarray) -> pa.Array:
+    """Zero-copy Arrow array over a contiguous numeric NumPy array (only the validity bitmap is new)."""
+    values = np.ascontiguousarray(values)
+    return pa.Array.from_buffers(pa.from_numpy_dtype(values.dtype), len(values), [_validity(mask), pa.py_buffer(values)])
+
+
+def _text(values: np.ndarray, mask: np.ndarray) -> pa.Array:
+    """Stripped strings from fixed-width bytes; missing and blank values are null."""
+    strings = pc.utf8_trim_whitespace(pa.array(values, pa.binary(), mask=mask).cast(pa.string()))
+    return pc.if_else(pc.equal(strings, ""), pa.scalar(None, pa.string()), strings)
+
+
+def _times(days: np.ndarray, mask: np.ndarray, units: str) -> pa.Array:
+    """'days since <date>' values as UTC microsecond timestamps."""
+    match = TIME_UNITS.match(units)
+    epoch = np.datetime64(f"{match.group(1)}T{match.group(2) or '00:00:00'}", "us")
+    micros = np.round(np.where(mask, 0, days) * 86_400_000_000).astype("int64") + epoch.astype("int64")
+    return _numeric(micros, mask).view(pa.timestamp("us", tz="UTC"))
+
+
+def _read(variable: netCDF4.Variable, start: int, stop: int) -> tuple[np.ndarray, np.ndarray]:
+    """One slab of profiles as (raw values, missing mask); char variables come back as fixed-width bytes."""
+    values = variable[start:stop]
+    if variable.dtype == np.dtype("S1") and variable.ndim > 1 and variable.dimensions[-1].startswith("STRING"):
+        values = netCDF4.chartostring(np.ma.filled(values, b" "), encoding="none")
+    return np.ma.getdata(values), np.ma.getmaskarray(values)
+
+
+def _columns(nc: netCDF4.Dataset) -> tuple[list[str], list[str]]:
+    """Names of the per-profile and per-level variables; variables along N_PARAM, N_CALIB, ... are left out."""
+    profile_vars, level_vars = [], []
+    for name, variable in nc.variables.items():
+        dims = variable.dimensions
+        if dims and dims[-1].startswith("STRING"):
+            dims = dims[:-1]
+        if dims == (PROFILE_DIM,):
+            profile_vars.append(name)
+        elif dims == (PROFILE_DIM, LEVEL_DIM):
+            level_vars.append(name)
+    return profile_vars, level_vars
+
+
+def to_rows(path: str | os.PathLike, batch_profiles: int = BATCH_PROFILES) -> Iterator[pa.RecordBatch]:
+    """RecordBatches of one row per profile and level of an Argo profile file (prof / Sprof).
+
+    Columns are the lower-cased names of the N_PROF and N_PROF x N_LEVELS variables plus n_levels, the level
+    index. Fill values are null, 'days since' variables (juld, juld_location) are timestamps, and padding rows
+    past a profile's last level (no value in any level variable) are dropped. Every batch has the same schema.
+    """
+    with netCDF4.Dataset(path) as nc:
+        if PROFILE_DIM not in nc.dimensions or LEVEL_DIM not in nc.dimensions:
+            return
+        profile_vars, level_vars = _columns(nc)
+        if not level_vars:
+            return
+        n_prof, n_levels = len(nc.dimensions[PROFILE_DIM]), len(nc.dimensions[LEVEL_DIM])
+        for start in range(0, n_prof, batch_profiles):
+            stop = min(start + batch_profiles, n_prof)
+            profiles = stop - start
+            # Row i belongs to profile i // n_levels of the slab
+            profile_index = pa.array(np.repeat(np.arange(profiles, dtype="int32"), n_levels))
+            names, arrays = [], []
+            for name in profile_vars:
+                variable = nc.variables[name]
+                values, mask = _read(variable, start, stop)
+                if values.dtype.kind == "S":
+                    encoded = _text(values, mask).dictionary_encode()
+                    arrays.append(pa.DictionaryArray.from_arrays(encoded.indices.take(profile_index), encoded.dictionary))
+                elif "days since" in getattr(variable, "units", ""):
+                    arrays.append(_times(np.repeat(values, n_levels), np.repeat(mask, n_levels), variable.units))
+                else:
+                    arrays.append(_numeric(np.repeat(values, n_levels), np.repeat(mask, n_levels)))
+                names.append(name.lower())
+            names.append("n_levels")
+            arrays.append(pa.array(np.tile(np.arange(n_levels, dtype="int32"), profiles)))
+            has_value = np.zeros(profiles * n_levels, dtype=bool)
+            for name in level_vars:
+                values, mask = _read(nc.variables[name], start, stop)
+                values, mask = values.reshape(-1), mask.reshape(-1)
+                if values.dtype.kind == "S":
+                    arrays.append(_text(values, mask))  # QC flags, one character per level
+                else:
+                    arrays.append(_numeric(values, mask))
+                    has_value |= ~mask
+                names.append(name.lower())
+            batch = pa.RecordBatch.from_arrays(arrays, names=names)
+            yield batch if has_value.all() else batch.filter(pa.array(has_value))
+
+
+def _source_metadata(path: Path) -> dict[bytes, bytes]:
+    """Footer metadata recording the source file's size and mtime, compared by is_current()."""
+    stat = path.stat()
+    return {SOURCE_SIZE_KEY: str(stat.st_size).encode(), SOURCE_MTIME_KEY: repr(stat.st_mtime).encode()}
+
+
+def output_path(source: Path, out_dir: Path = PROCESSED_DIR) -> Path:
+    """Parquet file a source .nc file is converted to: out_dir/<stem>.parquet."""
+    return out_dir / f"{source.stem}.parquet"
+
+
+def is_current(source: Path, output: Path) -> bool:
+    """True when output was written from source as it is now (size and mtime kept in the Parquet footer)."""
+    if not output.exists():
+        return False
+    try:
+        metadata = pq.read_schema(output).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    return all(metadata.get(key) == value for key, value in _source_metadata(source).items())
+
+
+def write_parquet(source: str | os.PathLike, output: str | os.PathLike) -> int:
+    """Streams to_rows(source) into output, one batch at a time; returns the number of rows written.
+
+    Rows go to <output>.tmp, which replaces output once complete, so an interrupted run never leaves a
+    truncated file that looks current. Files without profile data produce no output.
+    """
+    source, output = Path(source), Path(output)
+    tmp = output.with_name(output.name + ".tmp")
+    writer, rows = None, 0
+    try:
+        for batch in to_rows(source):
+            if writer is None:
+                schema = batch.schema.with_metadata(_source_metadata(source))
+                writer = pq.ParquetWriter(tmp, schema, compression=COMPRESSION)
+            writer.write_batch(batch, row_group_size=ROW_GROUP_ROWS)
+            rows += batch.num_rows
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            tmp.unlink()
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp, output)
+    return rows
+
+
+def _convert(source: Path, output: Path) -> tuple[Path, int, str | None]:
+    """Worker: (source, rows written, error message or None)."""
+    try:
+        return source, write_parquet(source, output), None
+    except Exception as e:
+        return source, 0, f"{type(e).__name__}: {e}"
+
+
+def ingest_directory(
+    raw_dir: Path = RAW_DIR,
+    out_dir: Path = PROCESSED_DIR,
+    workers: int | None = None,
+    force: bool = False,
+) -> dict[str, int]:
+    """Converts every .nc file under raw_dir to out_dir/<name>.parquet in a process pool.
+
+    Files whose output is current (is_current) are skipped unless force. Returns counts of converted,
+    skipped and failed files and of rows written; failures are printed and do not stop the run.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sources = sorted(raw_dir.rglob("*.nc"))
+    todo = [(s, output_path(s, out_dir)) for s in sources if force or not is_current(s, output_path(s, out_dir))]
+    stats = {"converted": 0, "skipped": len(sources) - len(todo), "failed": 0, "rows": 0}
+    if not todo:
+        return stats
+    # Largest first, so a big file does not start last and hold up the end of the run
+    todo.sort(key=lambda item: item[0].stat().st_size, reverse=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_convert, source, output) for source, output in todo]
+        for future in as_completed(futures):
+            source, rows, error = future.result()
+            if error:
+                stats["failed"] += 1
+                print(f"failed: {source.name}: {error}")
+            else:
+                stats["converted"] += 1
+                stats["rows"] += rows
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert Argo NetCDF profile files to Parquet.")
+    parser.add_argument("--parquet", action="store_true", help="write data/processed/*.parquet (the default)")
+    parser.add_argument("--raw-dir", type=Path, default=RAW_DIR)
+    parser.add_argument("--out-dir", type=Path, default=PROCESSED_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="rewrite outputs that are already current")
+    args = parser.parse_args()
+
+    stats = ingest_directory(args.raw_dir, args.out_dir, args.workers, args.force)
+    print(
+        f"Parquet: {stats['converted']} files converted ({stats['rows']:,} rows), "
+        f"{stats['skipped']} already current, {stats['failed']} failed -> {args.out_dir}"
+    )
+
+
+if __name__ == "__main__":
+    main()
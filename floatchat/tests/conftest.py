@@ -0,0 +1,23 @@
+"""Shared fixtures; run the suite from floatchat/ with python -m pytest."""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.backend import vectorstore  # noqa: E402
+from app.backend.rag import embeddings  # noqa: E402
+
+
+@pytest.fixture
+def chroma_store(tmp_path, monkeypatch):
+    """An empty Chroma store in tmp_path, searched with the hashing embedder."""
+    monkeypatch.setenv("CHROMA_PATH", str(tmp_path / "vectorstore"))
+    monkeypatch.setenv("EMBEDDING_MODEL", "hashing")
+    monkeypatch.delenv("VECTOR_BACKEND", raising=False)
+    vectorstore.get_client.cache_clear()
+    embeddings.get_embedder.cache_clear()
+    yield tmp_path / "vectorstore"
+    vectorstore.get_client.cache_clear()
+    embeddings.get_embedder.cache_clear()
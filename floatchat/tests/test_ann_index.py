@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.backend.rag import ann_index
+from app.backend.rag.ann_index import CURRENT_FILE, assign, get_index, kmeans, write_index
+
+ROWS, DIM, LISTS = 200, 16, 8
+T0 = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def rows():
+    """ROWS random unit vectors with metadata spread over 4 floats, 200 days and the whole globe."""
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((ROWS, DIM)).astype(np.float32)
+    metadatas = [
+        {
+            "platform_number": f"590000{i % 4}", "cycle_number": i // 4,
+            "profile_time": (T0 + timedelta(days=i)).isoformat(),
+            "latitude": float(rng.uniform(-60, 60)), "longitude": float(rng.uniform(-180, 180)),
+        }
+        for i in range(ROWS)
+    ]
+    metadatas[0] = {"platform_number": "5900000", "cycle_number": 0}  # no time, no position
+    ids = [f"{m['platform_number']}:{m['cycle_number']}" for m in metadatas]
+    return ids, vectors, metadatas, [f"summary {i}" for i in ids]
+
+
+@pytest.fixture
+def index(rows, tmp_path):
+    write_index(tmp_path, *rows, lists=LISTS)
+    return get_index(tmp_path)
+
+
+FILTERS = [
+    {},
+    {"platform": "5900002"},
+    {"start": T0 + timedelta(days=30), "end": T0 + timedelta(days=90)},
+    {"bbox": (-30.0, 30.0, -60.0, 60.0)},
+    {"bbox": (-60.0, 60.0, 150.0, -150.0)},  # across the antimeridian
+    {"platform": "5900001", "start": T0, "end": T0 + timedelta(days=100), "bbox": (-60.0, 60.0, 0.0, 180.0)},
+]
+
+
+def test_kmeans_and_assign():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, DIM)).astype(np.float32)
+    centroids = kmeans(vectors / np.linalg.norm(vectors, axis=1, keepdims=True), 4)
+    assert centroids.shape == (4, DIM)
+    np.testing.assert_allclose(np.linalg.norm(centroids, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(assign(vectors, centroids, chunk=7), np.argmax(vectors @ centroids.T, axis=1))
+
+
+def test_write_index_layout(index, rows):
+    assert len(index) == ROWS and index.centroids.shape == (LISTS, DIM)
+    assert index.offsets[0] == 0 and index.offsets[-1] == ROWS and np.all(np.diff(index.offsets) >= 0)
+    assert isinstance(index.vectors, np.memmap) and index.vectors.dtype == np.float16
+    assert sorted(map(str, index.ids)) == sorted(rows[0])
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_search_with_every_list_probed_is_exact(index, filters):
+    query = np.random.default_rng(1).standard_normal(DIM)
+    expected = index.exact_search(query, 10, **filters)
+    assert expected
+    assert index.search(query, 10, nprobe=LISTS, **filters) == expected
+
+
+@pytest.mark.parametrize("filters", FILTERS[1:])
+def test_filtered_search_inside_probed_lists(index, filters, monkeypatch):
+    monkeypatch.setattr(ann_index, "EXACT_FILTER_ROWS", 0)  # force the IVF path for filtered queries
+    query = np.random.default_rng(2).standard_normal(DIM)
+    hits = index.search(query, 5, nprobe=1, **filters)
+    exact = {row for row, _ in index.exact_search(query, 1_000, **filters)}
+    # nprobe grows until k rows pass the filter; every hit passes it
+    assert len(hits) == min(5, len(exact)) and {row for row, _ in hits} <= exact
+
+
+def test_filters_select_the_right_rows(index):
+    query = np.ones(DIM)
+    for row, _ in index.search(query, ROWS, platform="5900003"):
+        assert index.platform[row] == "5900003"
+    for row, _ in index.search(query, ROWS, bbox=(-60.0, 60.0, 150.0, -150.0)):
+        assert index.longitude[row] >= 150 or index.longitude[row] <= -150
+    start, end = T0 + timedelta(days=30), T0 + timedelta(days=40)
+    hits = index.search(query, ROWS, start=start, end=end)
+    assert len(hits) == 10
+    assert all(start.timestamp() <= index.time[row] < end.timestamp() for row, _ in hits)
+
+
+def test_search_nearest_first_and_hit(index, rows):
+    ids, vectors, metadatas, _ = rows
+    row, distance = index.search(vectors[5], 1, nprobe=LISTS)[0]
+    assert abs(distance) < 1e-3
+    hit = index.hit(row, distance)
+    assert hit["id"] == ids[5] and hit["summary"] == f"summary {ids[5]}"
+    assert hit["platform_number"] == metadatas[5]["platform_number"] and hit["cycle_number"] == 1
+    assert hit["profile_time"] == metadatas[5]["profile_time"]
+    assert hit["latitude"] == pytest.approx(metadatas[5]["latitude"])
+    bare = index.hit(index.search(vectors[0], 1, nprobe=LISTS)[0][0], 0.0)
+    assert "profile_time" not in bare and "latitude" not in bare
+
+
+def test_rebuild_keeps_previous_build(rows, tmp_path):
+    builds = [write_index(tmp_path, *rows, lists=LISTS) for _ in range(3)]
+    assert (tmp_path / CURRENT_FILE).read_text() == builds[-1].name
+    assert sorted(p.name for p in tmp_path.glob("build-*")) == sorted(b.name for b in builds[1:])
+    assert get_index(tmp_path).build == builds[-1]
+
+
+def test_empty_and_missing_index(tmp_path):
+    with pytest.raises(ValueError):
+        write_index(tmp_path, [], np.zeros((0, DIM)), [], [])
+    with pytest.raises(RuntimeError):
+        get_index(tmp_path / "none")
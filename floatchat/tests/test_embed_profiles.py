@@ -0,0 +1,60 @@
+import math
+from datetime import datetime, timezone
+
+from app.ingest.embed_profiles import _value, content_hash, profile_id, profile_metadata, summarize
+
+ROW = {
+    "platform_number": "7902246", "cycle_number": 2, "direction": "A",
+    "profile_time": datetime(2025, 1, 13, 14, 15, 33, tzinfo=timezone.utc),
+    "latitude": -1.0833, "longitude": 78.1833, "geo_cell": 30978, "data_mode": "D",
+    "project_name": "Argo INDIA", "pi_name": "M Ravichandran", "platform_type": "ARVOR", "data_centre": "IN",
+    "positioning_system": "GPS", "platform_maker": "NKE", "operating_institution": None, "float_owner": "",
+    "deployment_cruise_id": float("nan"), "launch_date": None,
+}
+
+
+def test_value_treats_null_nan_and_empty_as_missing():
+    assert _value(ROW, "platform_type") == "ARVOR"
+    assert _value(ROW, "operating_institution") is None
+    assert _value(ROW, "float_owner") is None
+    assert _value(ROW, "deployment_cruise_id") is None
+    assert _value(ROW, "no_such_field") is None
+
+
+def test_summarize():
+    assert summarize(ROW) == (
+        "Argo float 7902246 profile 2 (ascending), measured 13 January 2025 14:15 UTC, at 1.083°S 78.183°E. "
+        "Project Argo INDIA, PI M Ravichandran, data centre IN, platform ARVOR, made by NKE, positioning GPS, "
+        "delayed-mode data."
+    )
+
+
+def test_summarize_without_time_or_position():
+    row = {"platform_number": "7902246", "cycle_number": None}
+    assert summarize(row) == "Argo float 7902246 profile ?."
+
+
+def test_content_hash_depends_on_model_and_summary():
+    digest = content_hash("hashing:384", "summary")
+    assert digest == content_hash("hashing:384", "summary") and len(digest) == 32
+    assert digest != content_hash("hashing:64", "summary")
+    assert digest != content_hash("hashing:384", "summary.")
+
+
+def test_profile_id():
+    assert profile_id({"platform_number": "7902246", "cycle_number": 2.0}) == "7902246:2"
+
+
+def test_profile_metadata():
+    metadata = profile_metadata(ROW, "abc")
+    assert metadata == {
+        "content_hash": "abc", "platform_number": "7902246", "cycle_number": 2,
+        "latitude": -1.0833, "longitude": 78.1833, "geo_cell": 30978,
+        "profile_time": "2025-01-13T14:15:33+00:00", "profile_epoch": 1736777733,
+    }
+    assert all(value is not None for value in metadata.values())
+
+
+def test_profile_metadata_leaves_out_missing_values():
+    row = {"platform_number": 7902246, "cycle_number": 3, "latitude": math.nan, "longitude": None, "profile_time": None}
+    assert profile_metadata(row, "abc") == {"content_hash": "abc", "platform_number": "7902246", "cycle_number": 3}
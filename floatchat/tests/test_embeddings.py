@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from app.backend.rag.embeddings import HashingEmbedder, create_embedder, get_embedder
+
+
+def test_hashing_embedder_is_deterministic_unit_vectors():
+    texts = ["Argo float 7902246 profile 2, delayed-mode data.", "ARVOR float of Argo INDIA"]
+    first, second = HashingEmbedder().embed(texts), HashingEmbedder().embed(texts)
+    assert first.shape == (2, 384) and first.dtype == np.float32
+    np.testing.assert_array_equal(first, second)
+    np.testing.assert_allclose(np.linalg.norm(first, axis=1), 1.0, rtol=1e-6)
+
+
+def test_hashing_embedder_ranks_shared_words_closer():
+    query, near, far = HashingEmbedder().embed(["delayed-mode ARVOR", "ARVOR float in delayed-mode", "salinity 35.1"])
+    assert query @ near > query @ far
+
+
+def test_hashing_embedder_empty_text_is_zero():
+    assert not HashingEmbedder(16).embed([""]).any()
+
+
+def test_features_include_word_pairs():
+    assert HashingEmbedder()._features("Argo float 12.5") == ["argo", "float", "12.5", "argo float", "float 12.5"]
+
+
+def test_create_embedder_specs():
+    assert create_embedder("hashing").name == "hashing:384"
+    assert create_embedder("hashing:64").dim == 64
+    with pytest.raises(ValueError):
+        create_embedder("word2vec")
+
+
+def test_get_embedder_reads_env(chroma_store, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_MODEL", "hashing:32")
+    assert get_embedder().name == "hashing:32"
+    assert get_embedder() is get_embedder()
@@ -0,0 +1,125 @@
+import ast
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backend.rag import geo
+
+ETL_ARGO = Path(__file__).resolve().parents[2] / "argo_db" / "etl_argo.py"
+
+
+@pytest.fixture(scope="module")
+def ingest_geo_cell_ids():
+    """geo_cell_ids and its constants from argo_db/etl_argo.py, without importing the ETL (its logging
+    setup, DB engine and E:\\ paths run at import)."""
+    tree = ast.parse(ETL_ARGO.read_text(encoding="utf-8"))
+    wanted = {"GEO_CELL_DEG", "GEO_CELL_UNKNOWN", "geo_cell_ids"}
+    nodes = [
+        node for node in tree.body
+        if (isinstance(node, ast.FunctionDef) and node.name in wanted)
+        or (isinstance(node, ast.Assign) and any(getattr(t, "id", None) in wanted for t in node.targets))
+    ]
+    namespace = {"np": np, "pd": pd}
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), str(ETL_ARGO), "exec"), namespace)
+    assert namespace["GEO_CELL_DEG"] == geo.GEO_CELL_DEG
+    return namespace["geo_cell_ids"]
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat1, lat2 = np.radians(lat), np.radians(lats)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(np.radians(lons - lon) / 2) ** 2
+    return 2 * geo.EARTH_RADIUS_KM * np.arcsin(np.minimum(1, np.sqrt(a)))
+
+
+def test_cell_id_matches_ingest(ingest_geo_cell_ids):
+    positions = [
+        (0.0, 0.0), (-90.0, -180.0), (90.0, 180.0), (89.999, 179.999), (-0.5, -0.5),
+        (12.3, 359.5), (12.3, -0.5), (45.0, 540.0), (-33.9, 18.4), (10.0, -179.5),
+    ]
+    rng = np.random.default_rng(3)
+    positions += list(zip(rng.uniform(-90, 90, 500), rng.uniform(-180, 360, 500)))
+    lats, lons = zip(*positions)
+    expected = ingest_geo_cell_ids(pd.Series(lats), pd.Series(lons))
+    assert [geo.cell_id(lat, lon) for lat, lon in positions] == expected.tolist()
+    assert geo.cell_id(90.0, 0.0) < geo.CELL_ROWS * geo.CELL_COLS
+
+
+def covered(ranges: list[tuple[int, int]], cell: int) -> bool:
+    return any(lo <= cell <= hi for lo, hi in ranges)
+
+
+@pytest.mark.parametrize("lat, lon, radius_km", [
+    (10.0, 179.5, 300.0),  # across the antimeridian
+    (-20.0, -179.9, 1500.0),
+    (88.0, 10.0, 500.0),  # the cap holds the north pole
+    (-84.0, 120.0, 400.0),  # near the south pole, not holding it
+    (60.0, 0.0, 2000.0),
+    (0.0, 0.0, 0.5),
+])
+def test_cell_ranges_cover_the_circle(lat, lon, radius_km):
+    ranges = geo.cell_ranges(lat, lon, radius_km)
+    assert all(lo <= hi for lo, hi in ranges)
+    dlat = np.degrees(radius_km / geo.EARTH_RADIUS_KM) + 0.1
+    lats, lons = np.meshgrid(
+        np.linspace(max(lat - dlat, -90), min(lat + dlat, 90), 400), np.linspace(-180, 180, 1441), indexing="ij"
+    )
+    inside = haversine_km(lat, lon, lats, lons) <= radius_km
+    assert inside.any()
+    missed = [(a, b) for a, b in zip(lats[inside], lons[inside]) if not covered(ranges, geo.cell_id(a, b))]
+    assert not missed
+
+
+def test_cell_ranges_split_at_the_antimeridian():
+    ranges = geo.cell_ranges(10.0, 179.5, 300.0)
+    row = geo.cell_id(10.0, 179.5) // geo.CELL_COLS
+    first = row * geo.CELL_COLS
+    row_spans = sorted((lo - first, hi - first) for lo, hi in ranges if lo // geo.CELL_COLS == row)
+    # Two short spans, one each side of 180 degrees, instead of one across the whole row
+    assert len(row_spans) == 2 and row_spans[0][0] == 0 and row_spans[1][1] == geo.CELL_COLS - 1
+    assert all(hi - lo < 10 for lo, hi in ranges)
+    # A cap holding a pole takes whole rows, from the row 200 km south of the centre up to the pole
+    assert geo.cell_ranges(89.5, 0.0, 200.0) == [(177 * geo.CELL_COLS, 180 * geo.CELL_COLS - 1)]
+
+
+class StubConnection:
+    """Records the query and parameters and returns canned rows, as Connection.execute().mappings().all()."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows, self.calls = rows, []
+
+    def execute(self, query, params):
+        self.calls.append((str(query), params))
+        return self
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+def test_search_profiles_query_and_rows():
+    when = datetime(2023, 3, 5, tzinfo=timezone.utc)
+    conn = StubConnection([
+        {"platform_number": "7902246", "cycle_number": 1, "profile_time": when, "distance_km": 12.5},
+        {"platform_number": "7902246", "cycle_number": 2, "profile_time": None, "distance_km": 40.0},
+    ])
+    start, end = datetime(2023, 3, 1, tzinfo=timezone.utc), datetime(2023, 4, 1, tzinfo=timezone.utc)
+    rows = geo.search_profiles(conn, 10.0, 179.5, 300.0, start, end, limit=5)
+    assert rows[0]["profile_time"] == when.isoformat() and rows[1]["profile_time"] is None
+    assert rows[0]["distance_km"] == 12.5
+
+    query, params = conn.calls[0]
+    ranges = geo.cell_ranges(10.0, 179.5, 300.0)
+    assert [(params[f"cell_lo_{i}"], params[f"cell_hi_{i}"]) for i in range(len(ranges))] == ranges
+    assert query.count("geo_cell BETWEEN") == len(ranges)
+    assert params["start"] == start and params["end"] == end and params["limit"] == 5
+    assert "profile_time >= :start" in query and "LIMIT :limit" in query and "DISTINCT ON" not in query
+
+    geo.search_profiles(conn, 0.0, 0.0, 100.0, per_float=True)
+    query, params = conn.calls[1]
+    assert "DISTINCT ON (platform_number)" in query
+    assert "start" not in params and "limit" not in params and "LIMIT" not in query
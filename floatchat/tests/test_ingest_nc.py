@@ -0,0 +1,79 @@
+import os
+from datetime import datetime, timezone
+
+import netCDF4
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from app.ingest.ingest_nc import ingest_directory, is_current, output_path, to_rows, write_parquet
+
+FILL = 99999.0
+# Three profiles of up to four levels; profiles 1 and 2 are padded with fill values past their last level
+PRES = [[5.0, 10.0, 20.0, 30.0], [4.0, 8.0, FILL, FILL], [6.0, 12.0, 18.0, FILL]]
+TEMP = [[28.1, 27.9, FILL, 25.0], [29.0, 28.5, FILL, FILL], [27.0, 26.5, 26.0, FILL]]
+
+
+@pytest.fixture
+def prof_file(tmp_path):
+    """A tiny Argo-style prof file with the dimensions and variable kinds to_rows handles."""
+    path = tmp_path / "raw" / "7902246_prof.nc"
+    path.parent.mkdir()
+    with netCDF4.Dataset(path, "w") as nc:
+        nc.createDimension("N_PROF", 3)
+        nc.createDimension("N_LEVELS", 4)
+        nc.createDimension("STRING8", 8)
+        nc.createDimension("N_PARAM", 2)
+        platform = nc.createVariable("PLATFORM_NUMBER", "S1", ("N_PROF", "STRING8"))
+        platform[:] = netCDF4.stringtochar(np.array(["7902246 ", "7902246 ", "        "], dtype="S8"))
+        cycle = nc.createVariable("CYCLE_NUMBER", "i4", ("N_PROF",), fill_value=99999)
+        cycle[:] = np.ma.masked_array([1, 2, 0], mask=[False, False, True])
+        juld = nc.createVariable("JULD", "f8", ("N_PROF",), fill_value=999999.0)
+        juld.units = "days since 1950-01-01 00:00:00 UTC"
+        juld[:] = [27406.5, 27416.25, 27426.0]
+        nc.createVariable("STATION_PARAMETERS", "S1", ("N_PROF", "N_PARAM", "STRING8"))
+        for name, values in (("PRES", PRES), ("TEMP", TEMP)):
+            variable = nc.createVariable(name, "f4", ("N_PROF", "N_LEVELS"), fill_value=FILL)
+            variable[:] = np.ma.masked_equal(np.array(values, dtype="f4"), FILL)
+        qc = nc.createVariable("PRES_QC", "S1", ("N_PROF", "N_LEVELS"))
+        qc[:] = np.array([list("1111"), list("12  "), list("111 ")], dtype="S1")
+    return path
+
+
+def test_to_rows(prof_file):
+    batches = list(to_rows(prof_file, batch_profiles=2))
+    assert len(batches) == 2 and batches[0].schema == batches[1].schema
+    rows = [row for batch in batches for row in batch.to_pylist()]
+    # 4 + 2 + 3 levels: padding rows without any level value are gone
+    assert len(rows) == 9
+    assert [(r["cycle_number"], r["n_levels"]) for r in rows[:6]] == [(1, 0), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1)]
+    assert "station_parameters" not in rows[0]
+    first = rows[0]
+    assert first["platform_number"] == "7902246" and first["pres"] == 5.0 and first["pres_qc"] == "1"
+    assert first["juld"] == datetime(2025, 1, 13, 12, tzinfo=timezone.utc)
+    # A fill value inside a profile stays as a null row value
+    assert rows[2]["pres"] == 20.0 and rows[2]["temp"] is None
+    # Missing and blank per-profile values are null
+    assert rows[-1]["cycle_number"] is None and rows[-1]["platform_number"] is None
+    assert rows[5]["pres_qc"] == "2" and rows[-1]["pres"] == 18.0
+
+
+def test_write_parquet_and_is_current(prof_file, tmp_path):
+    output = output_path(prof_file, tmp_path)
+    assert output == tmp_path / "7902246_prof.parquet"
+    assert not is_current(prof_file, output)
+    assert write_parquet(prof_file, output) == 9
+    assert pq.read_table(output).num_rows == 9
+    assert not output.with_name(output.name + ".tmp").exists()
+    assert is_current(prof_file, output)
+    stat = prof_file.stat()
+    os.utime(prof_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not is_current(prof_file, output)
+
+
+def test_ingest_directory_skips_current_outputs(prof_file, tmp_path):
+    out_dir = tmp_path / "processed"
+    first = ingest_directory(prof_file.parent, out_dir, workers=1)
+    assert first == {"converted": 1, "skipped": 0, "failed": 0, "rows": 9}
+    assert ingest_directory(prof_file.parent, out_dir, workers=1)["skipped"] == 1
+    assert ingest_directory(prof_file.parent, out_dir, workers=1, force=True)["converted"] == 1
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.backend.rag import ann_index, geo, mcp_tools
+from app.backend.rag.embeddings import get_embedder
+from app.backend.vectorstore import get_profile_collection
+from app.ingest.embed_profiles import content_hash, profile_id, profile_metadata, summarize
+
+
+def profile(platform: str, cycle: int, when: datetime, lat: float, lon: float, platform_type: str) -> dict:
+    return {
+        "platform_number": platform, "cycle_number": cycle, "profile_time": when,
+        "latitude": lat, "longitude": lon, "platform_type": platform_type, "data_mode": "D",
+    }
+
+
+PROFILES = [
+    profile("7902246", 1, datetime(2023, 3, 5, tzinfo=timezone.utc), -1.0, 78.0, "ARVOR"),
+    profile("7902246", 2, datetime(2023, 3, 15, tzinfo=timezone.utc), -1.5, 78.5, "ARVOR"),
+    profile("7902246", 3, datetime(2023, 4, 1, tzinfo=timezone.utc), -2.0, 79.0, "ARVOR"),
+    profile("5906001", 1, datetime(2023, 3, 20, tzinfo=timezone.utc), 10.0, 179.5, "APEX"),
+    profile("5906001", 2, datetime(2023, 5, 20, tzinfo=timezone.utc), 10.5, -179.5, "APEX"),
+]
+
+
+@pytest.fixture
+def profile_store(chroma_store):
+    """The PROFILES embedded into a fresh Chroma store, as embed_profiles stores them."""
+    embedder = get_embedder()
+    summaries = [summarize(row) for row in PROFILES]
+    get_profile_collection().upsert(
+        ids=[profile_id(row) for row in PROFILES],
+        embeddings=embedder.embed(summaries).tolist(),
+        documents=summaries,
+        metadatas=[profile_metadata(row, content_hash(embedder.name, s)) for row, s in zip(PROFILES, summaries)],
+    )
+    return chroma_store
+
+
+def ids(hits: list[dict]) -> set[str]:
+    return {hit["id"] for hit in hits}
+
+
+def test_vector_search_ranks_by_meaning(profile_store):
+    hits = mcp_tools.vector_search("APEX float", k=2)
+    assert ids(hits) == {"5906001:1", "5906001:2"}
+    assert hits[0]["distance"] <= hits[1]["distance"]
+    assert hits[0]["summary"].startswith("Argo float 5906001")
+    assert {"platform_number", "cycle_number", "latitude", "longitude", "profile_time"} <= hits[0].keys()
+    assert "content_hash" not in hits[0] and "profile_epoch" not in hits[0]
+
+
+def test_vector_search_filters(profile_store):
+    assert ids(mcp_tools.vector_search("float", k=10, platform_number="5906001")) == {"5906001:1", "5906001:2"}
+    assert ids(mcp_tools.vector_search("float", k=10, month="2023-03")) == {"7902246:1", "7902246:2", "5906001:1"}
+    hits = mcp_tools.vector_search("float", k=10, platform_number="7902246", month="2023-03")
+    assert ids(hits) == {"7902246:1", "7902246:2"}
+    start = datetime(2023, 3, 15, tzinfo=timezone.utc)
+    hits = mcp_tools.vector_search("float", k=10, start=start, end=start + timedelta(days=10))
+    assert ids(hits) == {"7902246:2", "5906001:1"}
+
+
+def test_month_range():
+    assert mcp_tools._month_range("2023-03") == (
+        datetime(2023, 3, 1, tzinfo=timezone.utc), datetime(2023, 4, 1, tzinfo=timezone.utc)
+    )
+    assert mcp_tools._month_range("2023-12")[1] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_chroma_where():
+    start, end = mcp_tools._month_range("2023-03")
+    assert mcp_tools._chroma_where(None, None, None, None) is None
+    assert mcp_tools._chroma_where("7902246", None, None, None) == {"platform_number": "7902246"}
+    assert mcp_tools._chroma_where("7902246", start, end, None) == {"$and": [
+        {"platform_number": "7902246"},
+        {"profile_epoch": {"$gte": int(start.timestamp())}},
+        {"profile_epoch": {"$lt": int(end.timestamp())}},
+    ]}
+    assert mcp_tools._chroma_where(None, None, None, (0, 10, 170, -170)) == {"$and": [
+        {"latitude": {"$gte": 0}}, {"latitude": {"$lte": 10}},
+        {"$or": [{"longitude": {"$gte": 170}}, {"longitude": {"$lte": -170}}]},
+    ]}
+
+
+@pytest.mark.parametrize("backend", ["chroma", "ann"])
+def test_vector_search_bbox(profile_store, monkeypatch, backend):
+    monkeypatch.setenv("VECTOR_BACKEND", backend)
+    if backend == "ann":
+        ann_index.build_index()
+    assert ids(mcp_tools.vector_search("float", k=10, bbox=(-5, 0, 70, 80))) == {"7902246:1", "7902246:2", "7902246:3"}
+    assert ids(mcp_tools.vector_search("float", k=10, bbox=(0, 20, 170, -170))) == {"5906001:1", "5906001:2"}
+
+
+def test_vector_search_ann_backend_matches_chroma(profile_store, monkeypatch):
+    ann_index.build_index()
+    for filters in ({}, {"platform_number": "7902246"}, {"month": "2023-03"}):
+        chroma = mcp_tools.vector_search("ARVOR float in March", k=3, **filters)
+        monkeypatch.setenv("VECTOR_BACKEND", "ann")
+        ann = mcp_tools.vector_search("ARVOR float in March", k=3, **filters)
+        monkeypatch.delenv("VECTOR_BACKEND")
+        assert [hit["id"] for hit in ann] == [hit["id"] for hit in chroma]
+        assert [hit["distance"] for hit in ann] == pytest.approx([hit["distance"] for hit in chroma], abs=1e-3)
+        assert ann[0]["summary"] == chroma[0]["summary"]
+
+
+class StubEngine:
+    """get_engine() stand-in whose connect() hands out a placeholder connection."""
+
+    connection = object()
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self.connection
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def geo_searches(monkeypatch):
+    """Replaces geo.search_profiles with a stub that finds one float per 300 km of radius; returns its calls."""
+    calls = []
+
+    def search_profiles(conn, lat, lon, radius_km, start=None, end=None, per_float=False, limit=None):
+        assert conn is StubEngine.connection
+        calls.append({"radius_km": radius_km, "start": start, "end": end, "per_float": per_float, "limit": limit})
+        found = [{"platform_number": str(i), "distance_km": 300.0 * i} for i in range(int(radius_km // 300))]
+        return found[:limit]
+
+    monkeypatch.setattr(mcp_tools, "get_engine", StubEngine)
+    monkeypatch.setattr(geo, "search_profiles", search_profiles)
+    return calls
+
+
+def test_profiles_near(geo_searches):
+    start, end = mcp_tools._month_range("2023-03")
+    assert len(mcp_tools.profiles_near(0.0, 0.0, 1000.0, start, end, limit=2)) == 2
+    assert geo_searches[-1] == {"radius_km": 1000.0, "start": start, "end": end, "per_float": False, "limit": 2}
+    mcp_tools.profiles_near(0.0, 0.0, 50_000.0)
+    assert geo_searches[-1]["radius_km"] == geo.MAX_RADIUS_KM
+
+
+def test_nearest_floats_widens_the_radius(geo_searches):
+    floats = mcp_tools.nearest_floats(10.0, 179.5, k=5)
+    assert len(floats) == 5
+    assert [call["radius_km"] for call in geo_searches] == [250.0, 1000.0, 4000.0]
+    assert all(call["per_float"] and call["limit"] == 5 for call in geo_searches)
+
+
+def test_nearest_floats_stops_at_the_whole_globe(geo_searches):
+    assert len(mcp_tools.nearest_floats(0.0, 0.0, k=1000)) == int(geo.MAX_RADIUS_KM // 300)
+    radii = [call["radius_km"] for call in geo_searches]
+    assert radii == [250.0, 1000.0, 4000.0, 16000.0, geo.MAX_RADIUS_KM]
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from app.backend.vectorstore import PROFILE_COLLECTION, chroma_path, get_client, get_profile_collection
+
+
+def test_chroma_path_from_env(chroma_store):
+    assert chroma_path() == chroma_store
+
+
+def test_chroma_path_default(monkeypatch):
+    monkeypatch.delenv("CHROMA_PATH", raising=False)
+    assert chroma_path() == Path("./vectorstore")
+
+
+def test_profile_collection_is_cosine_and_persistent(chroma_store):
+    collection = get_profile_collection()
+    assert collection.name == PROFILE_COLLECTION
+    assert collection.metadata["hnsw:space"] == "cosine"
+    collection.add(ids=["7902246:1"], embeddings=[[1.0, 0.0]], documents=["profile"])
+    assert get_client() is get_client()
+    assert get_profile_collection().count() == 1
@@ -0,0 +1,109 @@
+"""Recall / latency benchmark of the in-process ANN index (app/backend/rag/ann_index.py) against exact search.
+
+    python -m tools.bench_vector_search                      # synthetic clustered embeddings (100k x 384)
+    python -m tools.bench_vector_search --rows 1000000
+    python -m tools.bench_vector_search --store              # the index built from CHROMA_PATH
+
+For each nprobe it reports recall@k (share of the exact top k found) and p50 / p95 query latency, without and
+with the pre-filters vector_search offers (platform, one year, a 20x20 degree box). Exact search is brute force
+over the same float16 matrix, so recall measures the IVF index alone.
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from app.backend.rag import ann_index
+
+
+def synthetic(rows: int, dim: int, seed: int = 0) -> tuple[np.ndarray, list[dict], list[str]]:
+    """Unit vectors drawn around rows / 500 topic centres, with Argo-like metadata (150 profiles per float)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((max(1, rows // 500), dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, len(centres), rows)] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    start, span = datetime(2005, 1, 1, tzinfo=timezone.utc).timestamp(), 20 * 365 * 86400
+    times = rng.uniform(start, start + span, rows)
+    lats, lons = rng.uniform(-70, 70, rows), rng.uniform(-180, 180, rows)
+    metadatas = [
+        {
+            "platform_number": str(5900000 + i // 150), "cycle_number": i % 150,
+            "profile_time": datetime.fromtimestamp(t, tz=timezone.utc).isoformat(), "latitude": la, "longitude": lo,
+        }
+        for i, (t, la, lo) in enumerate(zip(times, lats, lons))
+    ]
+    return vectors, metadatas, [f"{m['platform_number']}:{m['cycle_number']}" for m in metadatas]
+
+
+def percentile_ms(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q) * 1000)
+
+
+def run(index: ann_index.AnnIndex, queries: np.ndarray, k: int, nprobes: list[int], filters: dict) -> None:
+    truth = [{row for row, _ in index.exact_search(q, k, **filters)} for q in queries]
+    exact_times = []
+    for q in queries:
+        started = time.perf_counter()
+        index.exact_search(q, k, **filters)
+        exact_times.append(time.perf_counter() - started)
+    print(f"  exact        recall 1.000  p50 {percentile_ms(exact_times, 50):7.2f} ms  p95 {percentile_ms(exact_times, 95):7.2f} ms")
+    for nprobe in nprobes:
+        recalls, latencies = [], []
+        for q, expected in zip(queries, truth):
+            started = time.perf_counter()
+            found = {row for row, _ in index.search(q, k, nprobe=nprobe, **filters)}
+            latencies.append(time.perf_counter() - started)
+            recalls.append(len(found & expected) / max(1, len(expected)))
+        print(
+            f"  nprobe {nprobe:<5} recall {np.mean(recalls):.3f}  "
+            f"p50 {percentile_ms(latencies, 50):7.2f} ms  p95 {percentile_ms(latencies, 95):7.2f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--store", action="store_true", help="benchmark the index built from CHROMA_PATH")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store:
+            path = None
+        else:
+            vectors, metadatas, ids = synthetic(args.rows, args.dim)
+            started = time.perf_counter()
+            path = Path(tmp)
+            ann_index.write_index(path, ids, vectors, metadatas, [""] * len(ids))
+            print(f"Built {args.rows:,} x {args.dim} in {time.perf_counter() - started:.1f}s")
+            del vectors, metadatas, ids
+
+        started = time.perf_counter()
+        index = ann_index.get_index(path)
+        print(f"Loaded {len(index):,} rows, {len(index.centroids)} lists (mmap) in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        # Queries near the data: stored vectors with noise, as a real question lands near matching summaries
+        rng = np.random.default_rng(1)
+        picks = rng.integers(0, len(index), args.queries)
+        queries = index.vectors[np.sort(picks)].astype(np.float32)
+        queries += 0.5 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(queries.shape[1])
+
+        platform = str(index.platform[picks[0]])
+        cases = {
+            "no filter": {},
+            f"platform {platform}": {"platform": platform},
+            "year 2015": {"start": datetime(2015, 1, 1, tzinfo=timezone.utc), "end": datetime(2016, 1, 1, tzinfo=timezone.utc)},
+            "box 0..20N 60..80E": {"bbox": (0.0, 20.0, 60.0, 80.0)},
+        }
+        for name, filters in cases.items():
+            print(f"\n{name} (k={args.k}, {args.queries} queries)")
+            run(index, queries, args.k, args.nprobe, filters)
+
+
+if __name__ == "__main__":
+    main()